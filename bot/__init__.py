@@ -1,2 +1,8 @@
 from .bot import LilHalJr
 from . import common
+from .clock import Clock, VirtualClock, VirtualEventLoop
+from .governor import Overloaded, Priority, Throttled
+from .onboarding import OnboardingQueue
+from .persona import Persona
+from .settings import Behavior, GuildSettings
+from .watchdog import Stall, StallWatchdog
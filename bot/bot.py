@@ -1,7 +1,9 @@
 import asyncio
+import contextlib
 import logging
+import os
 import random
-import re
+import typing
 
 import discord
 from discord.ext import commands, tasks
@@ -9,52 +11,242 @@ from discord.ext import commands, tasks
 import config
 import helpers
 
-from . import common
+from . import common, runtime
+from .governor import LoadGovernor, Overloaded, Priority, Throttled
+from .health import HealthMonitor
+from .persona import Persona
+from .recorder import EventRecorder
+from .settings import GuildSettings
+from .waiters import Waiters
+from .watchdog import StallWatchdog
 
 logger = logging.getLogger("lilhaljr")
 
 
 class LilHalJr(commands.Bot):
     """
-    Lil Hal Jr.
+    Lil Hal Jr. Or any other persona built the same way.
     """
-    def __init__(self):
+    def __init__(self, persona: Persona = None):
         """
-        Initialize Lil Hal Jr. All intents, case-insensitive.
+        Initialize Lil Hal Jr. All intents, case-insensitive. Becomes the current client for the calling context, so
+        build each of several clients in its own, see `lil_hal_jr.py`.
+        :param persona: Who to be. Hal if None.
         """
-        self.name_pattern = re.compile(r"\bhal\b", re.IGNORECASE)
-
-        super().__init__(command_prefix='^',
+        self.persona = persona or Persona()
+        common.current.set(self)
+
+        # Per-client state. Apprehension by channel ID, and by category or guild ID for wider mutes.
+        self.muted_channels = {}
+        self.muted_scopes = {}
+        self.permissions = helpers.PermissionCache()
+        self.sent_messages = helpers.MessageIndex(config.SENT_MESSAGE_MEMORY)
+        self.waiters = Waiters()
+        self.analytics = helpers.Analytics()
+        self.__analytics_snapshot = None
+        self.pace = helpers.ActivityTracker(reply_window=config.REPLY_WINDOW, fast_rate=config.FAST_CHANNEL_RATE)
+        self.settings = GuildSettings(self.persona.settings_file, config.GUILD_SETTINGS_CACHE)
+
+        # Event counters, for health checks. Handlers waiting on purpose, like for a lull, are idle rather than busy.
+        self.events_dispatched = 0
+        self.event_backlog = 0
+        self.event_idle = 0
+        self.health = HealthMonitor(self, config.HEALTH_HOST, self.persona.health_port,
+                                    lag_threshold=config.LAG_THRESHOLD)
+        self.governor = LoadGovernor(self, config.SHED_LAG_LIMITS, config.SHED_BACKLOG_LIMITS)
+        self.throttle = helpers.CommandThrottle(config.THROTTLE_LIMITS)
+        self.watchdog = StallWatchdog(config.STALL_THRESHOLD, history=config.STALL_HISTORY)
+
+        # Opt-in traffic capture.
+        self.recorder = None
+        if config.RECORD_EVENTS:
+            self.recorder = EventRecorder(self.persona.record_directory, config.RECORD_MAX_BYTES,
+                                          config.RECORD_CONTENT, os.getenv("RECORD_SALT", ""))
+
+        super().__init__(command_prefix=self.persona.prefix,
                          intents=discord.Intents.all(),
                          case_insensitive=True,
-                         help_command=helpers.LilHalJrHelp(self))
+                         help_command=helpers.LilHalJrHelp())
+
+        if not config.GATEWAY_COMPRESSION:
+            runtime.use_compression(self, False)
+
+        self.add_check(self.priority_check)
+        self.add_check(self.throttle_check)
+        self.apprehension_cooldown_loop.start()
+        if self.persona.analytics_file is not None:
+            self.analytics_flush_loop.start()
+
+    # ==================================== KEYED WAITS ====================================
+    def dispatch(self, event_name: str, *args, **kwargs) -> None:
+        """ Wakes keyed waiters before the usual dispatch. Handlers see this client as current. """
+        self.events_dispatched += 1
+        common.current.set(self)
+
+        if self.recorder is not None:
+            self.recorder.record(event_name, args)
+
+        self.waiters.dispatch(event_name, args)
+        self.pace.dispatch(event_name, args, common.clock.time())
+        super().dispatch(event_name, *args, **kwargs)
+
+    def _schedule_event(self, coro, event_name: str, *args, **kwargs) -> asyncio.Task:
+        """ Counts event handlers that haven't finished yet. """
+        task = super()._schedule_event(coro, event_name, *args, **kwargs)
+
+        self.event_backlog += 1
+        task.add_done_callback(self.__event_done)
+
+        return task
+
+    def __event_done(self, _task: asyncio.Task) -> None:
+        self.event_backlog -= 1
+
+    @property
+    def busy_handlers(self) -> int:
+        """ Unfinished event handlers that aren't just waiting on purpose. """
+        return self.event_backlog - self.event_idle
+
+    @contextlib.contextmanager
+    def idle_handler(self) -> typing.Iterator[None]:
+        """ Marks the calling event handler as waiting on purpose, so it doesn't count as load while inside. """
+        self.event_idle += 1
+        try:
+            yield
+        finally:
+            self.event_idle -= 1
+
+    async def wait_for_channel(self, event: str, channel_ids: int | typing.Iterable[int],
+                               check: typing.Callable[..., bool] = None, timeout: float = None):
+        """
+        Like `wait_for`, but only wakes for events in the given channel(s).
+        :param event: "message" or "typing".
+        :param channel_ids: One channel ID, or several.
+        :param check: Optional additional check, taking the event's arguments.
+        :param timeout: Seconds before `asyncio.TimeoutError`. None waits forever.
+        :return: The event's arguments, like `wait_for`.
+        """
+        if isinstance(channel_ids, int):
+            channel_ids = (channel_ids,)
+
+        return await self.waiters.wait(event, "channel", channel_ids, check, timeout)
+
+    async def wait_for_author(self, event: str, author_ids: int | typing.Iterable[int],
+                              check: typing.Callable[..., bool] = None, timeout: float = None):
+        """
+        Like `wait_for`, but only wakes for events by the given user(s).
+        :param event: "message" or "typing".
+        :param author_ids: One user ID, or several.
+        :param check: Optional additional check, taking the event's arguments.
+        :param timeout: Seconds before `asyncio.TimeoutError`. None waits forever.
+        :return: The event's arguments, like `wait_for`.
+        """
+        if isinstance(author_ids, int):
+            author_ids = (author_ids,)
+
+        return await self.waiters.wait(event, "author", author_ids, check, timeout)
 
     # ==================================== HELPER OPERATIONS ====================================
+    @staticmethod
+    def command_priority(ctx: commands.Context) -> Priority:
+        """
+        A command's priority under load: the owner's for the Dev cog, otherwise whatever the command declares in its
+        `extras`, like the mute commands do, or an ordinary command's.
+        :param ctx: Command context.
+        :return: The command's priority.
+        """
+        if ctx.cog is not None and ctx.cog.qualified_name == "Dev":
+            return Priority.OWNER
+
+        return ctx.command.extras.get("priority", Priority.COMMAND)
+
+    async def priority_check(self, ctx: commands.Context) -> bool:
+        """
+        Global command check. Sheds commands under load, everyone else's before the owner's. Muting is never shed.
+        :param ctx: Command context.
+        :return: True if the command may run.
+        """
+        if not self.governor.allows(self.command_priority(ctx)):
+            raise Overloaded()
+
+        return True
+
+    async def throttle_check(self, ctx: commands.Context) -> bool:
+        """
+        Global command check. Limits how fast anyone can run commands, per user, channel and guild. Muting and the
+        owner's commands aren't limited, so no amount of spam holds them up.
+        :param ctx: Command context.
+        :return: True if the command may run.
+        """
+        if self.command_priority(ctx) <= Priority.OWNER:
+            return True
+
+        now = common.clock.time()
+        if not self.throttle.allow(ctx.command.qualified_name, ctx.author.id, ctx.channel.id,
+                                   ctx.guild.id if ctx.guild else None, now):
+            raise Throttled(self.throttle.warn(ctx.author.id, now))
+
+        return True
+
     async def is_referenced(self, message: discord.Message) -> bool:
         """
         Checks if Hal is mentioned/referenced in the given message.
         :param message:
         :return: True if Hal is pinged, or mentioned by name.
         """
-        return self.user.mentioned_in(message) or self.name_pattern.findall(message.content)
+        return self.user.mentioned_in(message) or self.is_named(message.content)
+
+    def is_named(self, content: str) -> bool:
+        """
+        Checks if Hal is mentioned by name in the given text.
+        :param content: Message content.
+        :return: True if Hal's name appears.
+        """
+        return self.persona.is_named(content)
+
+    @staticmethod
+    def is_chatter(content: str) -> bool:
+        """
+        Checks if a message is long enough for Hal to chime in after.
+        :param content: Message content.
+        :return: True if Hal may respond.
+        """
+        return len(content.split()) > 3
+
+    def is_muted(self, channel: discord.abc.Messageable) -> bool:
+        """
+        Checks if Hal is muted in a channel, by the channel itself, its category, or its whole guild.
+        :param channel: Any channel.
+        :return: True if muted.
+        """
+        if channel.id in self.muted_channels:
+            return True
+
+        if not self.muted_scopes:
+            return False
+
+        guild = getattr(channel, "guild", None)
+        return getattr(channel, "category_id", None) in self.muted_scopes or \
+            (guild is not None and guild.id in self.muted_scopes)
 
     def clean_apprehension(self, modifier: int = 0) -> None:
         """
-        Cleans up the quiet channel dictionary, removes any unmuted channels.
+        Cleans up the quiet channel and scope dictionaries, removes any unmuted entries.
         """
-        # Creating a list avoids runtime error.
-        pop_channels = []
+        for muted in (self.muted_channels, self.muted_scopes):
+            # Creating a list avoids runtime error.
+            pop_ids = []
 
-        for channel_id, value in common.muted_channels.items():
-            # Optional modifier
-            if modifier:
-                common.muted_channels[channel_id] += modifier
+            for muted_id in muted:
+                # Optional modifier
+                if modifier:
+                    muted[muted_id] += modifier
 
-            if value < 1:
-                pop_channels.append(channel_id)
+                if muted[muted_id] < 1:
+                    pop_ids.append(muted_id)
 
-        for channel_id in pop_channels:
-            common.muted_channels.pop(channel_id)
+            for muted_id in pop_ids:
+                muted.pop(muted_id)
 
     def update_apprehension(self, message: discord.Message) -> None:
         """
@@ -62,25 +254,28 @@ class LilHalJr(commands.Bot):
         :param message:
         :return:
         """
-        # If channel is muted, check for unmuting keywords.
-        if message.channel.id in common.muted_channels.keys() and helpers.check_match(config.return_phrases, message):
-            common.muted_channels[message.channel.id] = 0
+        behavior = self.settings.get(message.guild.id if message.guild else None)
+
+        # If channel is muted, check for unmuting keywords. Wider mutes are left to admins.
+        if message.channel.id in self.muted_channels.keys() and \
+                helpers.check_match(behavior.return_matcher, message, self.persona.require):
+            self.muted_channels.pop(message.channel.id)
+            self.analytics.count(helpers.analytics.UNMUTED, message.channel.id)
 
         # Check for muting keywords.
-        if mute_request := helpers.check_match(config.quiet_phrases.keys(), message):
+        if mute_request := helpers.check_match(behavior.quiet_matcher, message, self.persona.require):
             # Feedback.
             common.emoji_confirmation(message)
+            self.analytics.count(helpers.analytics.SHUSHED, message.channel.id)
 
             # Get mute value, plus one for safety.
-            mute_value = config.quiet_phrases[mute_request] + 1
+            mute_value = behavior.quiet_phrases[mute_request] + 1
 
             # Update quiet channels.
             try:
-                common.muted_channels[message.channel.id] += mute_value
+                self.muted_channels[message.channel.id] += mute_value
             except KeyError:
-                common.muted_channels[message.channel.id] = mute_value
-
-        self.clean_apprehension()
+                self.muted_channels[message.channel.id] = mute_value
 
     async def wait_loop(self, message: discord.Message) -> None:
         """
@@ -88,17 +283,23 @@ class LilHalJr(commands.Bot):
         :param message:
         :return:
         """
-        wait = random.randint(1, 4) if await self.is_referenced(message) else None
+        if await self.is_referenced(message):
+            wait = random.randint(1, 4)
 
-        def check(channel: discord.TextChannel, *_) -> bool:
-            """ Simple check. Return `True` extends the wait. """
-            return channel == message.channel
+        # Otherwise, a little longer than the channel's usual lulls. Not at all if he can't get a word in.
+        elif (wait := self.pace.reply_window(message.channel.id, common.clock.time())) is None:
+            return
 
         # This is the cycle of waiting that decides when he will acknowledge/participate in conversation.
-        try:
-            await self.wait_for("typing", check=check, timeout=wait or random.randint(5, 12) + random.random())
-        except asyncio.TimeoutError:
-            await common.speak_in(message.channel)
+        # Anyone typing in the channel extends the wait. Waiting for a lull isn't load.
+        with self.idle_handler():
+            try:
+                await self.wait_for_channel("typing", message.channel.id, timeout=wait)
+            except asyncio.TimeoutError:
+                behavior = self.settings.get(message.guild.id if message.guild else None)
+
+                if random.random() < behavior.reply_chance and self.governor.allows(Priority.AMBIENT):
+                    await common.speak_in(message.channel)
 
     # ==================================== EVENTS ====================================
     async def on_ready(self):
@@ -112,49 +313,102 @@ class LilHalJr(commands.Bot):
         Lil Hal Junior waits for a gap in conversation to say something
         :param message:
         """
+        # Remember his own messages, for shushing reactions later, and count them.
+        if message.author == self.user:
+            self.sent_messages.add(message.id, message.channel.id)
+            self.analytics.count(helpers.analytics.SPOKE, message.channel.id)
+            return
+
         # Don't respond to himself.
         if message.channel.last_message.author == self.user:
             return
 
+        # Check for muting/unmuting keywords. First, so it happens no matter the load.
+        self.update_apprehension(message)
+
         # Process commands. No response if a command was processed.
         await self.process_commands(message)
 
-        # Check for muting/unmuting keywords.
-        self.update_apprehension(message)
-
         # Check if muted.
-        if message.channel.id in common.muted_channels or message.author == self.user:
+        if self.is_muted(message.channel) or message.author == self.user:
             return
 
-        # Trigger waiting loop if message is long enough.
-        elif len(message.content.split()) > 3:
+        # Trigger waiting loop if message is long enough, and there's room for chatter.
+        elif self.is_chatter(message.content) and self.governor.allows(Priority.AMBIENT):
             await self.wait_loop(message)
 
-    async def on_reaction_add(self, reaction: discord.Reaction, user: discord.Member | discord.User):
+    async def on_raw_reaction_add(self, payload: discord.RawReactionActionEvent):
         """
-        Alternative method to mute Hal in a server: reaction with the shushing emoji.
-        :param reaction: The Discord reaction.
-        :param user: The user reacting.
+        Alternative method to mute Hal in a server: reaction with the shushing emoji. Raw events work on any of Hal's
+        remembered messages, cached or not.
+        :param payload: The raw reaction event.
         """
+        if str(payload.emoji) != self.settings.get(payload.guild_id).quiet_emoji or payload.user_id == self.user.id:
+            return
+
         # Ignore if the reaction isn't on Hal's message.
-        if reaction.message.author != self.user:
+        channel_id = self.sent_messages.get(payload.message_id)
+        if channel_id is None:
             return
 
         # Shushing reaction.
-        if reaction.emoji == config.QUIET_EMOJI:
-            common.muted_channels[reaction.message.channel.id] = 4  # this should actually add 4, but i'm not there yet.
-            logger.info(f"[{reaction.message.channel}] {user} muted Hal.")
+        self.muted_channels[channel_id] = self.muted_channels.get(channel_id, 0) + config.QUIET_EMOJI_VALUE
+        self.analytics.count(helpers.analytics.SHUSHED, channel_id)
+        logger.info(f"[{self.get_channel(channel_id)}] {payload.member or payload.user_id} muted Hal.")
 
     async def on_guild_remove(self, guild: discord.Guild):
-        # Clear all silenced channels.
+        # Clear all silenced channels, categories, and the guild.
         for channel in guild.channels:
-            common.muted_channels.pop(channel.id)
+            self.muted_channels.pop(channel.id, None)
+            self.muted_scopes.pop(channel.id, None)
+        self.muted_scopes.pop(guild.id, None)
+
+        # Forget messages sent there, and how fast its channels were.
+        channel_ids = {channel.id for channel in guild.channels}
+        self.sent_messages.forget_channels(channel_ids)
+        self.pace.forget_channels(channel_ids)
+
+        self.permissions.invalidate_guild(guild.id)
+
+    # Permission cache invalidation.
+    async def on_guild_update(self, _before: discord.Guild, after: discord.Guild):
+        self.permissions.invalidate_guild(after.id)
+
+    async def on_guild_role_update(self, _before: discord.Role, after: discord.Role):
+        # Only roles Hal has, and @everyone, affect him.
+        if after.is_default() or after in after.guild.me.roles:
+            self.permissions.invalidate_guild(after.guild.id)
+
+    async def on_guild_role_delete(self, role: discord.Role):
+        self.permissions.invalidate_guild(role.guild.id)
+
+    async def on_member_update(self, before: discord.Member, after: discord.Member):
+        if after.id == self.user.id and (before.roles != after.roles or before.timed_out != after.timed_out):
+            self.permissions.invalidate_guild(after.guild.id)
+
+    async def on_guild_channel_update(self, before: discord.abc.GuildChannel, after: discord.abc.GuildChannel):
+        # Category changes can cascade to synced channels.
+        if isinstance(after, discord.CategoryChannel) or before.category_id != after.category_id:
+            self.permissions.invalidate_guild(after.guild.id)
+
+        elif before.overwrites != after.overwrites:
+            self.permissions.invalidate_channel(after.id, after.guild.id)
+
+    async def on_guild_channel_delete(self, channel: discord.abc.GuildChannel):
+        self.permissions.invalidate_channel(channel.id, channel.guild.id)
+        self.pace.forget_channels({channel.id})
+        self.muted_channels.pop(channel.id, None)
+        self.muted_scopes.pop(channel.id, None)
 
     async def on_command_error(self, ctx: commands.Context, error: commands.CommandError):
         """ When a general command error occurs. """
         if isinstance(error, commands.MissingRequiredArgument) or isinstance(error, commands.BadArgument):
             common.emoji_confirmation(ctx.message, False)
 
+        # One reaction per run of throttled commands, no more.
+        elif isinstance(error, Throttled) and error.notify:
+            asyncio.create_task(ctx.message.add_reaction(config.THROTTLE_EMOJI))
+
     # ==================================== TASKS ====================================
     @tasks.loop(minutes=15)
     async def apprehension_cooldown_loop(self) -> None:
@@ -163,3 +417,19 @@ class LilHalJr(commands.Bot):
         """
         self.clean_apprehension(-1)
 
+    @tasks.loop(minutes=config.ANALYTICS_INTERVAL)
+    async def analytics_flush_loop(self) -> None:
+        """
+        Every so often, Hal writes down how he's been behaving.
+        """
+        await self.flush_analytics()
+
+    async def flush_analytics(self) -> None:
+        """ Appends what the counters did since the last flush to the persona's analytics file, off the loop. """
+        if self.persona.analytics_file is None:
+            return
+
+        snapshot = self.analytics.snapshot(common.clock.time())
+        before, self.__analytics_snapshot = self.__analytics_snapshot, snapshot
+
+        await asyncio.to_thread(helpers.analytics.write_csv, self.persona.analytics_file, before, snapshot)
@@ -0,0 +1,128 @@
+"""
+    Hal's sense of time. Everything in `bot` and `cogs` that pauses or checks the time goes through `common.clock`, so a
+    virtual clock can be swapped in to fast-forward hours of waiting into seconds.
+"""
+import asyncio
+import datetime as dt
+import selectors
+import time
+import types
+
+import discord
+from discord.ext import tasks
+
+
+class Clock:
+    """
+    The real clock. Wall time, and asyncio sleeps.
+    """
+    def time(self) -> float:
+        """ Seconds since the epoch. """
+        return time.time()
+
+    def now(self, tz: dt.tzinfo | None = dt.timezone.utc) -> dt.datetime:
+        """ The current date and time. UTC by default. """
+        return dt.datetime.fromtimestamp(self.time(), tz)
+
+    async def sleep(self, delay: float) -> None:
+        """ Sleeps for the given amount of seconds. """
+        await asyncio.sleep(delay)
+
+
+class VirtualClock(Clock):
+    """
+    A clock that reads the time off a `VirtualEventLoop`. Sleeping on it costs no real time.
+    """
+    def __init__(self, loop: "VirtualEventLoop", epoch: float = 0.0):
+        """
+        Connects to a virtual loop.
+        :param loop: The virtual event loop to read time from.
+        :param epoch: Wall time, in seconds since the epoch, at which the simulation starts.
+        """
+        self.loop = loop
+        self.epoch = epoch
+
+        self.__patched = []
+
+    def time(self) -> float:
+        return self.epoch + self.loop.time()
+
+    def install(self) -> None:
+        """
+        Points Pycord's notion of "now" at this clock, so `tasks.loop` schedules in virtual time too.
+        """
+        clock = self
+
+        class VirtualDatetime(dt.datetime):
+            @classmethod
+            def now(cls, tz: dt.tzinfo | None = None) -> dt.datetime:
+                return clock.now(tz)
+
+            @classmethod
+            def utcnow(cls) -> dt.datetime:
+                return clock.now().replace(tzinfo=None)
+
+        shim = types.ModuleType("datetime")
+        shim.__dict__.update(vars(dt))
+        shim.datetime = VirtualDatetime
+
+        for module in (discord.utils, tasks):
+            self.__patched.append((module, module.datetime))
+            module.datetime = shim
+
+    def uninstall(self) -> None:
+        """ Undoes `install()`. """
+        while self.__patched:
+            module, original = self.__patched.pop()
+            module.datetime = original
+
+
+class _FastForwardSelector(selectors.BaseSelector):
+    """
+    Wraps a real selector. Instead of blocking until the next timer is due, it jumps the loop's clock straight to it.
+    """
+    def __init__(self, loop: "VirtualEventLoop", selector: selectors.BaseSelector):
+        self.__loop = loop
+        self.__selector = selector
+
+    def register(self, fileobj, events, data=None):
+        return self.__selector.register(fileobj, events, data)
+
+    def unregister(self, fileobj):
+        return self.__selector.unregister(fileobj)
+
+    def modify(self, fileobj, events, data=None):
+        return self.__selector.modify(fileobj, events, data)
+
+    def get_map(self):
+        return self.__selector.get_map()
+
+    def close(self) -> None:
+        self.__selector.close()
+
+    def select(self, timeout: float | None = None):
+        # Nothing scheduled at all: block for real, something outside the loop has to wake it.
+        if timeout is None:
+            return self.__selector.select(None)
+
+        ready = self.__selector.select(0)
+        if not ready and timeout > 0:
+            self.__loop.advance(timeout)
+
+        return ready
+
+
+class VirtualEventLoop(asyncio.SelectorEventLoop):
+    """
+    An event loop running on virtual time. Whenever the loop would sit idle waiting for a timer, time skips ahead.
+    """
+    def __init__(self):
+        self.__time = 0.0
+        super().__init__(_FastForwardSelector(self, selectors.DefaultSelector()))
+
+    def time(self) -> float:
+        return self.__time
+
+    def advance(self, seconds: float) -> None:
+        """ Moves the loop's time forward. """
+        self.__time += seconds
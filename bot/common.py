@@ -1,12 +1,24 @@
+from __future__ import annotations
+
 import asyncio
+import contextvars
 import random
+import typing
 
 import discord
 
-import helpers
+from .clock import Clock
+
+if typing.TYPE_CHECKING:
+    from .bot import LilHalJr
 
 # ====================== VARS
-muted_channels = {}
+# Swappable for a `VirtualClock` when simulating. Shared by every client on the loop.
+clock = Clock()
+
+# The client whose event is being handled. Set on construction and on every dispatch, so listeners, commands and the
+# tasks they start all know who they're speaking for.
+current: contextvars.ContextVar[LilHalJr] = contextvars.ContextVar("current")
 
 
 # ====================== SYNCHRONOUS FUNCTIONS
@@ -29,9 +41,8 @@ def emoji_confirmation(message: discord.Message, thumbs_up: bool = True) -> None
     asyncio.create_task(response())
 
 
-# ====================== ASYNC ROUTINES
-async def pause(low: int = 5, high: int = 20, multiplier: int = None, base_time: int = None) -> None:
-    """ Pausing shortcut, using asyncio.sleep(). Pauses within the given range. """
+def pause_time(low: int = 5, high: int = 20, multiplier: int = None, base_time: int = None) -> float:
+    """ Seconds for a pause within the given range, like `pause` would take. """
     if base_time is None:
         # Apply multiplier -- work in progress.
         if multiplier is not None:
@@ -43,49 +54,38 @@ async def pause(low: int = 5, high: int = 20, multiplier: int = None, base_time:
         else:
             base_time = low
 
-    await asyncio.sleep(base_time + random.random())
+    return base_time + random.random()
 
 
-async def speak_in(channel: discord.TextChannel, message: str = None, **kwargs) -> discord.Message | None:
+# ====================== ASYNC ROUTINES
+async def pause(low: int = 5, high: int = 20, multiplier: int = None, base_time: int = None) -> None:
+    """ Pausing shortcut, using the current clock. Pauses within the given range. """
+    await clock.sleep(pause_time(low, high, multiplier, base_time))
+
+
+async def speak_in(channel: discord.TextChannel, message: str = None, show_typing: bool = True,
+                   **kwargs) -> discord.Message | None:
     """
     Hal speaks in a channel.
     :param channel: Channel to speak in.
     :param message: The content to send. Optional: if None, replaced by hmm/yes/interesting.
+    :param show_typing: Type for a moment first. Off for queued messages, whose pause was already taken.
     :param kwargs: All keyword arguments are passed through `channel.send()`.
     :return:
     """
+    bot = current.get()
+
     # Safety, possible double safety.
-    if not channel.can_send(discord.Message):
+    if not bot.permissions.can_send(channel):
         return
 
     # Generate dialogue.
     if message is None:
-        message = helpers.basic()
+        message = bot.persona.basic()
 
     # Send.
-    await channel.trigger_typing()
-    await pause(0, (len(message) % 80) // 5)
+    if show_typing:
+        await channel.trigger_typing()
+        await pause(0, (len(message) % 80) // 5)
 
     return await channel.send(message, **kwargs)
-
-
-async def introduce_self(channel: discord.TextChannel) -> None:
-    """
-    Hal sends an introduction to the given channel.
-    :param channel: Expected introduction channel.
-    :return: No return value
-    """
-    await pause(20, 25)
-    intro = "Hal\nHe/It\nI can quiet down when you tell me."
-
-    await speak_in(channel, intro)
-
-
-async def say_hello(channel: discord.TextChannel) -> None:
-    """
-    Hal says hello.
-    :param channel: Channel in which to say hello.
-    :return: No return value
-    """
-    await pause(5, 10)
-    await speak_in(channel, "Hello.")
@@ -0,0 +1,136 @@
+"""
+    Load shedding. When the event loop lags or busy handlers pile up, Hal drops his optional chatter first, so muting
+    and commands keep working.
+"""
+from __future__ import annotations
+
+import enum
+import logging
+import typing
+
+from discord.ext import commands
+
+from . import common
+
+if typing.TYPE_CHECKING:
+    from .bot import LilHalJr
+
+logger = logging.getLogger("lilhaljr")
+
+
+class Priority(enum.IntEnum):
+    """
+    Kinds of work, most important first.
+    """
+    MUTE = 0  # Muting and unmuting. Never shed.
+    OWNER = 1  # Owner commands.
+    COMMAND = 2  # Everyone else's commands.
+    AMBIENT = 3  # "Hmm.", toasts, greetings, social loops.
+
+
+class Overloaded(commands.CheckFailure):
+    """
+    Raised when a command is shed under load.
+    """
+
+
+class Throttled(commands.CheckFailure):
+    """
+    Raised when someone runs commands faster than their limits allow.
+    """
+    def __init__(self, notify: bool):
+        """
+        :param notify: True if it's worth a reaction, the first time in a row.
+        """
+        super().__init__()
+        self.notify = notify
+
+
+class LoadGovernor:
+    """
+    Decides which priorities are allowed to run, from loop lag and busy event handlers. Each pressure stage sheds one
+    more priority, lowest first. Stepping back down waits for pressure to fall well under the limit.
+    """
+    def __init__(self, bot: LilHalJr, lag_limits: tuple[float, ...] = (0.25, 0.5, 1.0),
+                 backlog_limits: tuple[int, ...] = (250, 500, 1000), interval: float = 1.0):
+        """
+        :param bot: Hal, for his health readings.
+        :param lag_limits: Average loop lag, in seconds, for each stage of shedding.
+        :param backlog_limits: Busy event handlers for each stage of shedding. Handlers idly waiting for a lull don't
+            count, however many there are.
+        :param interval: Minimum seconds between re-evaluations.
+        """
+        self.bot = bot
+        self.lag_limits = lag_limits
+        self.backlog_limits = backlog_limits
+        self.interval = interval
+
+        # Everything at or past this priority is shed. Past the last priority means nothing is.
+        self.level = len(Priority)
+        self.shed_count = 0
+
+        self.__checked = float("-inf")
+
+    @property
+    def stage(self) -> int:
+        """ How many priorities are being shed. """
+        return len(Priority) - self.level
+
+    def __pressure(self, relief: float = 1.0) -> int:
+        """ The stage the current readings call for, with limits scaled by `relief`. """
+        lag = self.bot.health.lag_average
+        backlog = self.bot.busy_handlers
+
+        stage = 0
+        for lag_limit, backlog_limit in zip(self.lag_limits, self.backlog_limits):
+            if lag >= lag_limit * relief or backlog >= backlog_limit * relief:
+                stage += 1
+
+        return stage
+
+    def update(self) -> None:
+        """ Re-evaluates pressure, at most once per interval. """
+        now = common.clock.time()
+        if now - self.__checked < self.interval:
+            return
+        self.__checked = now
+
+        stage = self.stage
+        target = self.__pressure()
+
+        # Shed more right away. Recover one stage at a time, once well clear of the limits.
+        if target > stage:
+            stage = target
+        elif stage > 0 and self.__pressure(relief=0.5) < stage:
+            stage -= 1
+        else:
+            return
+
+        # Muting is never shed.
+        level = max(len(Priority) - stage, Priority.MUTE + 1)
+        if level == self.level:
+            return
+
+        if level == len(Priority):
+            logger.warning(f"Load back to normal, stopped shedding. {self.shed_count} tasks shed.")
+            self.shed_count = 0
+        else:
+            shed = ", ".join(p.name.lower() for p in Priority if p >= level)
+            logger.warning(f"Under load (lag {self.bot.health.lag_average:.3f}s, "
+                           f"busy handlers {self.bot.busy_handlers}), shedding: {shed}.")
+
+        self.level = level
+
+    def allows(self, priority: Priority) -> bool:
+        """
+        Checks if work of the given priority should go ahead.
+        :param priority: The work's priority.
+        :return: True if it may run. False if it should be dropped or postponed.
+        """
+        self.update()
+
+        if priority < self.level:
+            return True
+
+        self.shed_count += 1
+        return False
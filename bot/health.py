@@ -0,0 +1,151 @@
+"""
+    Hal's vital signs: event loop lag, gateway latency and the event backlog, served over HTTP on localhost for a
+    process supervisor.
+
+    GET /livez    200 while the loop is turning at all.
+    GET /readyz   200 once Hal is ready and loop lag is under the threshold, 503 otherwise.
+    GET /metrics  Prometheus text format.
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+import math
+import typing
+
+from aiohttp import web
+
+from . import common
+
+if typing.TYPE_CHECKING:
+    from .bot import LilHalJr
+
+logger = logging.getLogger("lilhaljr")
+
+
+class HealthMonitor:
+    """
+    Measures loop lag continuously, and serves health checks and metrics.
+    """
+    def __init__(self, bot: LilHalJr, host: str = "127.0.0.1", port: int = 8080,
+                 interval: float = 0.5, lag_threshold: float = 1.0):
+        """
+        Prepares the monitor. Nothing runs until `start()`.
+        :param bot: Hal.
+        :param host: Address to serve on. Keep it local.
+        :param port: Port to serve on. 0 disables the server, but lag is still measured.
+        :param interval: Seconds between lag samples.
+        :param lag_threshold: Seconds of lag past which Hal isn't ready.
+        """
+        self.bot = bot
+        self.host = host
+        self.port = port
+        self.interval = interval
+        self.lag_threshold = lag_threshold
+
+        # Lag, in seconds.
+        self.lag = 0.0
+        self.lag_average = 0.0
+        self.lag_max = 0.0
+
+        self.__task: asyncio.Task | None = None
+        self.__runner: web.AppRunner | None = None
+
+    # ==================================== LIFECYCLE ====================================
+    async def start(self) -> None:
+        """ Starts measuring, and serving if a port is set. """
+        if self.__task is not None:
+            return
+
+        self.__task = asyncio.create_task(self.__measure())
+
+        if self.port:
+            app = web.Application()
+            app.add_routes([web.get("/livez", self.__livez),
+                            web.get("/readyz", self.__readyz),
+                            web.get("/metrics", self.__metrics)])
+
+            self.__runner = web.AppRunner(app, access_log=None)
+            await self.__runner.setup()
+            await web.TCPSite(self.__runner, self.host, self.port).start()
+
+            logger.info(f"Health checks at http://{self.host}:{self.port}/.")
+
+    async def stop(self) -> None:
+        """ Stops everything. Safe to call more than once. """
+        if self.__task is not None:
+            self.__task.cancel()
+            self.__task = None
+
+        if self.__runner is not None:
+            await self.__runner.cleanup()
+            self.__runner = None
+
+    async def __measure(self) -> None:
+        """ Sleeps for a set interval, and counts how late the loop wakes up. """
+        loop = asyncio.get_running_loop()
+
+        while True:
+            expected = loop.time() + self.interval
+            await common.clock.sleep(self.interval)
+
+            self.lag = max(loop.time() - expected, 0.0)
+            self.lag_average += (self.lag - self.lag_average) * 0.1
+            self.lag_max = max(self.lag_max, self.lag)
+
+    # ==================================== STATE ====================================
+    @property
+    def ready(self) -> bool:
+        """ Ready means connected, and not lagging behind. """
+        return self.bot.is_ready() and self.lag_average < self.lag_threshold
+
+    def snapshot(self) -> dict[str, float]:
+        """
+        Current readings.
+        :return: Metric names mapped to values.
+        """
+        latency = self.bot.latency
+
+        readings = {
+            "ready": float(self.ready),
+            "loop_lag_seconds": self.lag,
+            "loop_lag_average_seconds": self.lag_average,
+            "loop_lag_max_seconds": self.lag_max,
+            "gateway_latency_seconds": latency if math.isfinite(latency) else -1.0,
+            "events_dispatched_total": self.bot.events_dispatched,
+            "event_backlog": self.bot.event_backlog,
+            "event_handlers_idle": self.bot.event_idle,
+            "keyed_waiters": len(self.bot.waiters),
+            "tracked_channels": len(self.bot.pace),
+            "analytics_channels": len(self.bot.analytics),
+            "throttle_buckets": len(self.bot.throttle),
+            "muted_channels": len(self.bot.muted_channels),
+            "muted_scopes": len(self.bot.muted_scopes),
+            "permission_cache_hits_total": self.bot.permissions.hits,
+            "permission_cache_misses_total": self.bot.permissions.misses,
+            "guild_settings_overrides": len(self.bot.settings),
+            "guild_settings_cached": self.bot.settings.cached,
+            "loop_stalls_recent": len(self.bot.watchdog.stalls),
+            "guilds": len(self.bot.guilds)
+        }
+
+        if self.bot.recorder is not None:
+            readings["events_recorded_total"] = self.bot.recorder.recorded
+            readings["events_record_dropped_total"] = self.bot.recorder.dropped
+
+        return readings
+
+    # ==================================== ROUTES ====================================
+    async def __livez(self, _request: web.Request) -> web.Response:
+        return web.Response(text=f"ok, lag {self.lag:.3f}s\n")
+
+    async def __readyz(self, _request: web.Request) -> web.Response:
+        if self.ready:
+            return web.Response(text="ready\n")
+
+        reason = "not connected" if not self.bot.is_ready() else f"lagging {self.lag_average:.3f}s"
+        return web.Response(status=503, text=f"{reason}\n")
+
+    async def __metrics(self, _request: web.Request) -> web.Response:
+        lines = [f"lilhaljr_{name} {value:g}" for name, value in self.snapshot().items()]
+        return web.Response(text="\n".join(lines) + "\n", content_type="text/plain")
@@ -0,0 +1,157 @@
+"""
+    One queue for greetings and introductions, so joining hundreds of guilds at once, or rejoining them after an outage,
+    trickles out instead of flooding Discord's REST API. Only the REST calls are limited: a job's pause is waited out on
+    a timer before it joins the line, so pauses never hold up anyone else.
+"""
+from __future__ import annotations
+
+import asyncio
+import collections
+import itertools
+import logging
+import typing
+
+logger = logging.getLogger("lilhaljr")
+
+Job = typing.Callable[[], typing.Awaitable[None]]
+
+
+class OnboardingQueue:
+    """
+    Runs jobs in arrival order, with limits on how many run at once overall and per guild. Guilds take turns, so one
+    guild's backlog doesn't hold up the rest.
+    """
+    def __init__(self, limit: int = 4, guild_limit: int = 1, backlog: int = 1000):
+        """
+        :param limit: Most jobs running at once.
+        :param guild_limit: Most jobs running at once in one guild.
+        :param backlog: Most jobs waiting, counting those still pausing. Past it, new jobs are dropped.
+        """
+        self.limit = limit
+        self.guild_limit = guild_limit
+        self.backlog = backlog
+
+        self.dropped = 0
+        self.__full = False
+
+        self.__pending: dict[int, collections.deque[Job]] = {}
+        self.__waiting = 0
+        self.__running: dict[int, int] = {}
+        self.__active = 0
+
+        # Jobs still pausing, by guild, as timers.
+        self.__delayed: dict[int, dict[int, asyncio.TimerHandle]] = {}
+        self.__pausing = 0
+        self.__keys = itertools.count()
+
+        # Guilds with waiting jobs and room to run one, in turn.
+        self.__ready: collections.deque[int] = collections.deque()
+        self.__queued: set[int] = set()
+
+    def __len__(self) -> int:
+        """ Jobs waiting, counting those still pausing. """
+        return self.__waiting + self.__pausing
+
+    @property
+    def active(self) -> int:
+        """ Jobs running. """
+        return self.__active
+
+    def submit(self, guild_id: int, job: Job, delay: float = 0) -> bool:
+        """
+        Queues a job. Nothing is created until it's the job's turn.
+        :param guild_id: The guild it's for.
+        :param job: Makes the coroutine to run, like `functools.partial(common.speak_in, channel, "Hello.")`.
+        :param delay: Seconds to pause before joining the line, without taking a turn.
+        :return: False if the backlog was full, and the job dropped.
+        """
+        if len(self) >= self.backlog:
+            self.dropped += 1
+            if not self.__full:
+                self.__full = True
+                logger.warning(f"Onboarding backlog full at {self.backlog} jobs, dropping new ones until it drains.")
+            return False
+
+        self.__full = False
+
+        if delay > 0:
+            key = next(self.__keys)
+            timers = self.__delayed.setdefault(guild_id, {})
+            timers[key] = asyncio.get_running_loop().call_later(delay, self.__arrive, guild_id, key, job)
+            self.__pausing += 1
+        else:
+            self.__enqueue(guild_id, job)
+
+        return True
+
+    def cancel(self, guild_id: int) -> None:
+        """ Drops a guild's waiting and pausing jobs, like when Hal leaves it. Running ones finish. """
+        jobs = self.__pending.pop(guild_id, None)
+        if jobs is not None:
+            self.__waiting -= len(jobs)
+
+        timers = self.__delayed.pop(guild_id, None)
+        if timers is not None:
+            for timer in timers.values():
+                timer.cancel()
+            self.__pausing -= len(timers)
+
+    def __arrive(self, guild_id: int, key: int, job: Job) -> None:
+        """ A job's pause is over, it gets in line. """
+        timers = self.__delayed[guild_id]
+        del timers[key]
+        if not timers:
+            del self.__delayed[guild_id]
+        self.__pausing -= 1
+
+        self.__enqueue(guild_id, job)
+
+    def __enqueue(self, guild_id: int, job: Job) -> None:
+        self.__pending.setdefault(guild_id, collections.deque()).append(job)
+        self.__waiting += 1
+        self.__make_ready(guild_id)
+        self.__pump()
+
+    def __make_ready(self, guild_id: int) -> None:
+        if guild_id not in self.__queued and guild_id in self.__pending and \
+                self.__running.get(guild_id, 0) < self.guild_limit:
+            self.__ready.append(guild_id)
+            self.__queued.add(guild_id)
+
+    def __pump(self) -> None:
+        """ Starts jobs while there's room. """
+        while self.__active < self.limit and self.__ready:
+            guild_id = self.__ready.popleft()
+            self.__queued.discard(guild_id)
+
+            # Cancelled since it was readied.
+            jobs = self.__pending.get(guild_id)
+            if not jobs:
+                continue
+
+            job = jobs.popleft()
+            if not jobs:
+                del self.__pending[guild_id]
+            self.__waiting -= 1
+
+            self.__running[guild_id] = self.__running.get(guild_id, 0) + 1
+            self.__active += 1
+
+            task = asyncio.create_task(job())
+            task.add_done_callback(lambda done, g=guild_id: self.__finished(g, done))
+
+            # Back of the line for its next job.
+            self.__make_ready(guild_id)
+
+    def __finished(self, guild_id: int, task: asyncio.Task) -> None:
+        self.__active -= 1
+        if self.__running[guild_id] == 1:
+            del self.__running[guild_id]
+        else:
+            self.__running[guild_id] -= 1
+
+        if not task.cancelled() and task.exception() is not None:
+            logger.warning(f"Onboarding job for guild {guild_id} failed: {task.exception()!r}")
+
+        self.__make_ready(guild_id)
+        self.__pump()
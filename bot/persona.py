@@ -0,0 +1,70 @@
+"""
+    Personas: who a client is. Several can run on one event loop, each with its own token, prefix, cogs and way of
+    talking, sharing everything else in the process.
+"""
+from __future__ import annotations
+
+import re
+
+import config
+import helpers
+
+
+class Persona:
+    """
+    A client's identity and dialogue. Never changed once made, so one can be shared freely.
+    """
+    __slots__ = ("name", "token_variable", "prefix", "cogs", "catchphrases", "rare_catchphrase", "introduction",
+                 "hello", "settings_file", "health_port", "record_directory", "analytics_file", "require",
+                 "name_pattern")
+
+    def __init__(self, name: str = "Hal", token_variable: str = "DISCORD_TOKEN", prefix: str = "^",
+                 cogs: tuple[str, ...] = None, catchphrases: tuple[str, ...] = ("Hmm.", "Yes.", "Interesting."),
+                 rare_catchphrase: str = "Oh.", introduction: str = "Hal\nHe/It\nI can quiet down when you tell me.",
+                 hello: str = "Hello.", settings_file: str = config.GUILD_SETTINGS_FILE,
+                 health_port: int = config.HEALTH_PORT, record_directory: str = config.RECORD_DIRECTORY,
+                 analytics_file: str | None = config.ANALYTICS_FILE):
+        """
+        :param name: The name it answers to, and needs to hear before it'll be shushed.
+        :param token_variable: Environment variable holding its token.
+        :param prefix: Command prefix.
+        :param cogs: Extensions to load, from `cogs`. All implemented cogs if None.
+        :param catchphrases: What it says when it chimes in.
+        :param rare_catchphrase: What it very rarely says instead.
+        :param introduction: Sent to introduction channels on joining a server.
+        :param hello: Sent to general channels on joining a server, and to greet new members.
+        :param settings_file: Its own per-guild settings file.
+        :param health_port: Its own health check port. 0 disables serving.
+        :param record_directory: Its own folder for event recordings.
+        :param analytics_file: Its own behavior counters file. None to keep them in memory only.
+        """
+        self.name = name
+        self.token_variable = token_variable
+        self.prefix = prefix
+        self.cogs = cogs
+        self.catchphrases = tuple(catchphrases)
+        self.rare_catchphrase = rare_catchphrase
+        self.introduction = introduction
+        self.hello = hello
+        self.settings_file = settings_file
+        self.health_port = health_port
+        self.record_directory = record_directory
+        self.analytics_file = analytics_file
+
+        self.require = name.lower()
+        self.name_pattern = re.compile(rf"\b{re.escape(self.require)}\b", re.IGNORECASE)
+
+    def __repr__(self) -> str:
+        return f"<Persona {self.name}>"
+
+    def basic(self) -> str:
+        """ One of its catchphrases. """
+        return helpers.basic(self.catchphrases, self.rare_catchphrase)
+
+    def is_named(self, content: str) -> bool:
+        """
+        Checks if it's mentioned by name in the given text.
+        :param content: Message content.
+        :return: True if its name appears.
+        """
+        return self.name_pattern.search(content) is not None
@@ -0,0 +1,238 @@
+"""
+    Opt-in recording of gateway events, for reproducing production slowdowns offline.
+
+    The hot path copies the fields it needs out of the event into a plain dict and puts that on a queue, so no discord
+    object crosses threads. A background thread turns the dicts into JSON lines and appends them to gzip files, starting
+    a new file once the current one reaches its size limit. If the queue is full, events are dropped and counted rather
+    than slowing Hal down.
+
+    Format, version 1. Files are named `events-<UTC start time>-<sequence>.jsonl.gz`. Each line is one JSON object:
+        {"v": 1, "t": <unix seconds>, "e": <event name>, "d": <data>}
+    The first line of every file is a header, with "e": "header" and "d": {"content": <redaction mode>}.
+    Data by event, all IDs as integers:
+        message                 id, channel, guild, author, bot, mentions, length, content
+        typing                  channel, guild, user
+        raw_reaction_add/remove message, channel, guild, user, emoji
+        member_join/remove      guild, user, bot
+        guild_join/remove       guild, channels, members
+    `content` is the message text for "keep", a salted SHA-256 prefix for "hash", and null for "drop". `guild` is null
+    for direct messages. New fields may be added to "d" within a version; existing ones won't change.
+"""
+from __future__ import annotations
+
+import datetime as dt
+import gzip
+import hashlib
+import json
+import logging
+import os
+import queue
+import threading
+import typing
+
+from . import common
+
+logger = logging.getLogger("lilhaljr")
+
+VERSION = 1
+CONTENT_MODES = ("keep", "hash", "drop")
+
+
+def _guild_id(thing) -> int | None:
+    guild = getattr(thing, "guild", None)
+    return guild.id if guild is not None else None
+
+
+class EventRecorder:
+    """
+    Records gateway events to size-rotated, compressed, append-only files on a background thread.
+    """
+    EVENTS = ("message", "typing", "raw_reaction_add", "raw_reaction_remove", "member_join", "member_remove",
+              "guild_join", "guild_remove")
+
+    def __init__(self, directory: str, max_bytes: int = 64 * 1024 * 1024, content: str = "hash", salt: str = "",
+                 queue_size: int = 100_000, batch_size: int = 512):
+        """
+        Prepares a recorder. Nothing is written until `start()`.
+        :param directory: Folder for recordings. Created if needed.
+        :param max_bytes: Compressed size at which to start a new file.
+        :param content: What to do with message text: "keep", "hash" or "drop".
+        :param salt: Salt for hashed content.
+        :param queue_size: Events waiting to be written before new ones are dropped.
+        :param batch_size: Most events written per batch.
+        """
+        if content not in CONTENT_MODES:
+            raise ValueError(f"Content mode must be one of {CONTENT_MODES}.")
+
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.content = content
+        self.salt = salt.encode()
+        self.batch_size = batch_size
+
+        self.recorded = 0
+        self.dropped = 0
+
+        self.__queue: queue.Queue = queue.Queue(queue_size)
+        self.__thread: threading.Thread | None = None
+        self.__file: typing.BinaryIO | None = None
+        self.__raw: typing.BinaryIO | None = None
+        self.__sequence = 0
+
+    # ==================================== HOT PATH ====================================
+    def record(self, event: str, args: tuple) -> None:
+        """
+        Queues an event's data, if it's one that gets recorded. Never blocks. Call on the loop, since the event's
+        objects are read here and only here.
+        :param event: Event name, without "on_".
+        :param args: The event's arguments.
+        """
+        if event not in self.EVENTS or self.__thread is None:
+            return
+
+        try:
+            data = self.extract(event, args)
+        except Exception as error:  # A recorder must never take anything down with it.
+            logger.debug(f"Could not record {event}: {error}")
+            return
+
+        try:
+            self.__queue.put_nowait((common.clock.time(), event, data))
+        except queue.Full:
+            self.dropped += 1
+
+    # ==================================== LIFECYCLE ====================================
+    def start(self) -> None:
+        """ Starts the writing thread. """
+        if self.__thread is not None:
+            return
+
+        os.makedirs(self.directory, exist_ok=True)
+
+        self.__thread = threading.Thread(target=self.__run, name="event-recorder", daemon=True)
+        self.__thread.start()
+
+        logger.info(f"Recording events to {self.directory}, content: {self.content}.")
+
+    def stop(self) -> None:
+        """ Writes out everything queued, and closes the file. Blocks until done. """
+        if self.__thread is None:
+            return
+
+        thread, self.__thread = self.__thread, None
+        self.__queue.put(None)
+        thread.join()
+
+        logger.info(f"Stopped recording. {self.recorded} events recorded, {self.dropped} dropped.")
+
+    # ==================================== WRITING THREAD ====================================
+    def __run(self) -> None:
+        """ Writes batches until told to stop. """
+        running = True
+
+        while running:
+            batch = [self.__queue.get()]
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self.__queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            lines = []
+            for item in batch:
+                if item is None:
+                    running = False
+                    continue
+
+                lines.append(self.__line(*item))
+
+            if lines:
+                self.__write(b"".join(lines))
+                self.recorded += len(lines)
+
+        self.__close()
+
+    def __write(self, data: bytes) -> None:
+        """ Appends to the current file, rotating first if it's full. """
+        if self.__file is not None and self.__raw.tell() >= self.max_bytes:
+            self.__close()
+
+        if self.__file is None:
+            self.__open()
+
+        self.__file.write(data)
+        self.__file.flush()
+
+    def __open(self) -> None:
+        """ Starts a new file, with a header line. """
+        stamp = dt.datetime.now(dt.timezone.utc).strftime("%Y%m%d-%H%M%S")
+        path = os.path.join(self.directory, f"events-{stamp}-{self.__sequence:04}.jsonl.gz")
+        self.__sequence += 1
+
+        self.__raw = open(path, "ab")
+        self.__file = gzip.GzipFile(fileobj=self.__raw, mode="ab")
+        self.__file.write(self.__line(common.clock.time(), "header", {"content": self.content}))
+
+    def __close(self) -> None:
+        if self.__file is not None:
+            self.__file.close()
+            self.__raw.close()
+            self.__file = self.__raw = None
+
+    # ==================================== FORMAT ====================================
+    @staticmethod
+    def __line(timestamp: float, event: str, data: dict) -> bytes:
+        return json.dumps({"v": VERSION, "t": round(timestamp, 3), "e": event, "d": data},
+                          ensure_ascii=False, separators=(",", ":")).encode() + b"\n"
+
+    def __content(self, text: str) -> str | None:
+        """ Applies the content mode. """
+        if self.content == "keep":
+            return text
+        elif self.content == "hash":
+            return hashlib.sha256(self.salt + text.encode()).hexdigest()[:16]
+
+    def extract(self, event: str, args: tuple) -> dict:
+        """
+        Copies what gets recorded out of an event's arguments, applying the content mode.
+        :return: The event's data, plain values only.
+        """
+        if event == "message":
+            message = args[0]
+            data = {"id": message.id, "channel": message.channel.id, "guild": _guild_id(message),
+                    "author": message.author.id, "bot": message.author.bot,
+                    "mentions": [user.id for user in message.mentions], "length": len(message.content),
+                    "content": self.__content(message.content)}
+
+        elif event == "typing":
+            channel, user, _when = args
+            data = {"channel": channel.id, "guild": _guild_id(channel), "user": user.id}
+
+        elif event.startswith("raw_reaction"):
+            payload = args[0]
+            data = {"message": payload.message_id, "channel": payload.channel_id, "guild": payload.guild_id,
+                    "user": payload.user_id, "emoji": str(payload.emoji)}
+
+        elif event.startswith("member"):
+            member = args[0]
+            data = {"guild": member.guild.id, "user": member.id, "bot": member.bot}
+
+        else:
+            guild = args[0]
+            data = {"guild": guild.id, "channels": len(guild.channels), "members": len(guild.members)}
+
+        return data
+
+
+def read_recording(paths: typing.Iterable[str]) -> typing.Iterator[dict]:
+    """
+    Reads recordings back, in the order given, skipping headers.
+    :param paths: Recording files.
+    :return: Each recorded event, as written.
+    """
+    for path in paths:
+        with gzip.open(path, "rt", encoding="utf-8") as file:
+            for line in file:
+                event = json.loads(line)
+                if event["e"] != "header":
+                    yield event
@@ -0,0 +1,86 @@
+"""
+    Runtime profile: optional swaps for speed, each switched on its own, and each falling back to the stock behavior
+    when its package isn't installed.
+
+    event loop   uvloop instead of asyncio's own loop.
+    JSON         orjson for gateway and REST payloads. py-cord already picks orjson whenever it's importable; this
+                 makes the choice explicit, either way.
+    compression  zlib-stream on the gateway. py-cord asks for it by default; turning it off trades bandwidth for the
+                 CPU spent inflating.
+"""
+from __future__ import annotations
+
+import asyncio
+import functools
+import json
+import logging
+
+import discord
+
+logger = logging.getLogger("lilhaljr")
+
+
+def _stock_to_json(obj) -> str:
+    return json.dumps(obj, separators=(",", ":"), ensure_ascii=True)
+
+
+def use_uvloop(enabled: bool) -> bool:
+    """
+    Switches the event loop policy. Call before any client is built, as clients take their loop on construction.
+    :param enabled: True for uvloop.
+    :return: True if uvloop is in use.
+    """
+    if not enabled:
+        return False
+
+    try:
+        import uvloop
+    except ImportError:
+        logger.warning("uvloop isn't installed, using asyncio's event loop.")
+        return False
+
+    asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+    return True
+
+
+def use_orjson(enabled: bool) -> bool:
+    """
+    Switches py-cord's JSON codec.
+    :param enabled: True for orjson.
+    :return: True if orjson is in use.
+    """
+    if enabled:
+        try:
+            import orjson
+        except ImportError:
+            logger.warning("orjson isn't installed, using the json module.")
+        else:
+            discord.utils._to_json = lambda obj: orjson.dumps(obj).decode("utf-8")
+            discord.utils._from_json = orjson.loads
+            return True
+
+    discord.utils._to_json = _stock_to_json
+    discord.utils._from_json = json.loads
+    return False
+
+
+def use_compression(client: discord.Client, enabled: bool) -> None:
+    """
+    Chooses whether a client's gateway connection is zlib-stream compressed.
+    :param client: The client, before it connects.
+    :param enabled: False for uncompressed payloads.
+    """
+    http = client.http
+    http.get_gateway = functools.partial(type(http).get_gateway, http, zlib=enabled)
+    http.get_bot_gateway = functools.partial(type(http).get_bot_gateway, http, zlib=enabled)
+
+
+def apply(uvloop: bool, orjson: bool) -> dict[str, bool]:
+    """
+    Applies the process-wide parts of a profile.
+    :return: What ended up in use, by option.
+    """
+    active = {"uvloop": use_uvloop(uvloop), "orjson": use_orjson(orjson)}
+    logger.info("Runtime: " + ", ".join(f"{name} {'on' if on else 'off'}" for name, on in active.items()) + ".")
+
+    return active
@@ -0,0 +1,135 @@
+"""
+    Per-guild settings, laid over the defaults in `config.py` and saved to a local JSON file. Each guild's resolved
+    settings, compiled phrase matchers included, are kept in a bounded LRU cache. Guilds without overrides all share
+    the one default.
+"""
+import collections
+import json
+import logging
+import os
+
+import config
+import helpers
+
+logger = logging.getLogger("lilhaljr")
+
+
+class Behavior:
+    """
+    Resolved settings for one guild. Treat as read-only, it may be shared.
+    """
+    __slots__ = ("quiet_phrases", "return_phrases", "quiet_emoji", "reply_chance", "quiet_matcher", "return_matcher")
+
+    def __init__(self, quiet_phrases: dict[str, int], return_phrases: list[str], quiet_emoji: str,
+                 reply_chance: float):
+        """
+        Resolves and compiles a set of settings.
+        :param quiet_phrases: Silencing phrases, mapped to rudeness level.
+        :param return_phrases: Un-muting phrases.
+        :param quiet_emoji: Silencing reaction.
+        :param reply_chance: Chance, 0 to 1, that Hal chimes in when a conversation goes quiet.
+        """
+        self.quiet_phrases = quiet_phrases
+        self.return_phrases = return_phrases
+        self.quiet_emoji = quiet_emoji
+        self.reply_chance = reply_chance
+
+        self.quiet_matcher = helpers.PhraseMatcher(quiet_phrases)
+        self.return_matcher = helpers.PhraseMatcher(return_phrases)
+
+
+class GuildSettings:
+    """
+    Guild overrides, persisted, with an LRU cache of resolved `Behavior`s.
+    """
+    KEYS = ("quiet_phrases", "return_phrases", "quiet_emoji", "reply_chance")
+
+    def __init__(self, path: str | None = None, cache_size: int = 256):
+        """
+        Loads saved overrides, if any.
+        :param path: JSON file to persist to. None keeps everything in memory.
+        :param cache_size: Most resolved guilds to keep at once.
+        """
+        self.path = path
+        self.cache_size = cache_size
+
+        self.default = Behavior(dict(config.quiet_phrases), list(config.return_phrases), config.QUIET_EMOJI,
+                                config.REPLY_CHANCE)
+
+        self.__overrides: dict[int, dict] = {}
+        self.__cache: collections.OrderedDict[int, Behavior] = collections.OrderedDict()
+
+        if path is not None and os.path.exists(path):
+            with open(path, encoding="utf-8") as file:
+                self.__overrides = {int(guild_id): values for guild_id, values in json.load(file).items()}
+
+    def __len__(self) -> int:
+        """ Amount of guilds with overrides. """
+        return len(self.__overrides)
+
+    @property
+    def cached(self) -> int:
+        """ Amount of guilds currently resolved. """
+        return len(self.__cache)
+
+    def get(self, guild_id: int | None) -> Behavior:
+        """
+        Resolved settings for a guild.
+        :param guild_id: The guild, or None for direct messages.
+        :return: The guild's behavior. The shared default if it has no overrides.
+        """
+        overrides = self.__overrides.get(guild_id)
+        if not overrides:
+            return self.default
+
+        behavior = self.__cache.get(guild_id)
+        if behavior is not None:
+            self.__cache.move_to_end(guild_id)
+            return behavior
+
+        values = {key: overrides.get(key, getattr(self.default, key)) for key in self.KEYS}
+        behavior = self.__cache[guild_id] = Behavior(**values)
+
+        if len(self.__cache) > self.cache_size:
+            self.__cache.popitem(last=False)
+
+        return behavior
+
+    def overrides(self, guild_id: int) -> dict:
+        """ A copy of the guild's raw overrides. """
+        return dict(self.__overrides.get(guild_id, {}))
+
+    def set(self, guild_id: int, key: str, value) -> None:
+        """
+        Overrides one setting for a guild, and saves.
+        :param guild_id: The guild.
+        :param key: One of `KEYS`.
+        :param value: The new value. Phrases are compiled first, so a bad pattern raises ValueError and saves nothing.
+        """
+        if key not in self.KEYS:
+            raise KeyError(key)
+
+        if key in ("quiet_phrases", "return_phrases"):
+            helpers.PhraseMatcher(value)
+
+        self.__overrides.setdefault(guild_id, {})[key] = value
+        self.__cache.pop(guild_id, None)
+        self.save()
+
+    def reset(self, guild_id: int) -> None:
+        """ Drops all of a guild's overrides, and saves. """
+        self.__overrides.pop(guild_id, None)
+        self.__cache.pop(guild_id, None)
+        self.save()
+
+    def save(self) -> None:
+        """ Writes the overrides to disk, replacing the file in one step. """
+        if self.path is None:
+            return
+
+        temporary = self.path + ".tmp"
+        with open(temporary, "w", encoding="utf-8") as file:
+            json.dump({str(guild_id): values for guild_id, values in self.__overrides.items()}, file, indent=2)
+
+        os.replace(temporary, self.path)
+        logger.debug(f"Saved settings for {len(self.__overrides)} guilds.")
@@ -0,0 +1,109 @@
+"""
+    Keyed waits for gateway events. Unlike `Client.wait_for`, which runs every pending check on every event of a type,
+    waiters here are indexed by channel or author ID, so an event only wakes the waiters that care about it.
+"""
+import asyncio
+import typing
+
+
+# How to pull each kind of key out of an event's arguments.
+KEYS: dict[str, dict[str, typing.Callable[..., int]]] = {
+    "message": {
+        "channel": lambda message: message.channel.id,
+        "author": lambda message: message.author.id
+    },
+    "typing": {
+        "channel": lambda channel, user, when: channel.id,
+        "author": lambda channel, user, when: user.id
+    }
+}
+
+
+class Waiter:
+    """
+    A single pending wait, possibly registered under several keys.
+    """
+    __slots__ = ("future", "check", "keys")
+
+    def __init__(self, future: asyncio.Future, check: typing.Callable[..., bool] | None, keys: list[tuple]):
+        self.future = future
+        self.check = check
+        self.keys = keys
+
+
+class Waiters:
+    """
+    Pending keyed waits, by (event, key kind, ID).
+    """
+    def __init__(self):
+        self.__index: dict[tuple[str, str, int], list[Waiter]] = {}
+
+    def __len__(self) -> int:
+        return sum(len(waiters) for waiters in self.__index.values())
+
+    async def wait(self, event: str, kind: str, ids: typing.Iterable[int],
+                   check: typing.Callable[..., bool] = None, timeout: float = None):
+        """
+        Waits for an event matching any of the given IDs.
+        :param event: Event name, without "on_". Must be in `KEYS`.
+        :param kind: "channel" or "author".
+        :param ids: The IDs to wait on.
+        :param check: Optional additional check, taking the event's arguments.
+        :param timeout: Seconds before `asyncio.TimeoutError`. None waits forever.
+        :return: The event's arguments, the same shape `Client.wait_for` returns them.
+        """
+        if kind not in KEYS.get(event, {}):
+            raise ValueError(f"Can't wait for {event} by {kind}.")
+
+        future = asyncio.get_running_loop().create_future()
+        waiter = Waiter(future, check, [(event, kind, i) for i in ids])
+
+        for key in waiter.keys:
+            self.__index.setdefault(key, []).append(waiter)
+
+        future.add_done_callback(lambda _: self.__remove(waiter))
+
+        return await asyncio.wait_for(future, timeout)
+
+    def dispatch(self, event: str, args: tuple) -> None:
+        """
+        Wakes the waiters for an event.
+        :param event: Event name, without "on_".
+        :param args: The event's arguments.
+        """
+        kinds = KEYS.get(event)
+        if kinds is None or not self.__index:
+            return
+
+        for kind, get_id in kinds.items():
+            waiters = self.__index.get((event, kind, get_id(*args)))
+            if not waiters:
+                continue
+
+            for waiter in list(waiters):
+                if waiter.future.done():
+                    continue
+
+                try:
+                    if waiter.check is not None and not waiter.check(*args):
+                        continue
+                except Exception as error:
+                    waiter.future.set_exception(error)
+                    continue
+
+                waiter.future.set_result(args[0] if len(args) == 1 else args)
+
+    def __remove(self, waiter: Waiter) -> None:
+        """ Unregisters a finished waiter from all its keys. """
+        for key in waiter.keys:
+            waiters = self.__index.get(key)
+            if waiters is None:
+                continue
+
+            try:
+                waiters.remove(waiter)
+            except ValueError:
+                pass
+
+            if not waiters:
+                del self.__index[key]
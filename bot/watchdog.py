@@ -0,0 +1,155 @@
+"""
+    Blocking-call detection. The event loop bumps a heartbeat every few milliseconds; a watchdog thread notices when it
+    stops, samples the loop thread's stack, and blames whichever of Hal's own listeners or commands was running.
+"""
+from __future__ import annotations
+
+import asyncio
+import collections
+import logging
+import os
+import sys
+import threading
+import time
+import traceback
+import types
+
+from . import common
+
+logger = logging.getLogger("lilhaljr")
+
+# Frames from files in these packages are Hal's own.
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PACKAGES = tuple(os.path.join(ROOT, package) + os.sep for package in ("bot", "cogs", "helpers"))
+
+
+class Stall:
+    """
+    One period where the event loop made no progress.
+    """
+    __slots__ = ("started", "duration", "culprit", "innermost", "stack")
+
+    def __init__(self, started: float, culprit: str, innermost: str, stack: list[str]):
+        """
+        :param started: Wall time the stall started at.
+        :param culprit: The listener, command or task loop of Hal's that was running.
+        :param innermost: The innermost of Hal's functions on the stack, where the time was actually going.
+        :param stack: A short formatted stack.
+        """
+        self.started = started
+        self.duration = 0.0
+        self.culprit = culprit
+        self.innermost = innermost
+        self.stack = stack
+
+    def __str__(self) -> str:
+        where = self.culprit if self.culprit == self.innermost else f"{self.culprit} -> {self.innermost}"
+        return f"{self.duration * 1000:.0f} ms in {where}"
+
+
+def _name(frame: types.FrameType) -> str:
+    """ Module-qualified function name for a frame. """
+    module = os.path.splitext(os.path.relpath(frame.f_code.co_filename, ROOT))[0].replace(os.sep, ".")
+    return f"{module}:{frame.f_code.co_qualname}"
+
+
+def _is_own(frame: types.FrameType) -> bool:
+    filename = frame.f_code.co_filename
+    return filename.startswith(PACKAGES) and filename != __file__
+
+
+def _is_entry(frame: types.FrameType) -> bool:
+    """ Listeners, commands and task loops, by this repo's naming. """
+    name = frame.f_code.co_name
+    return name.startswith(("on_", "command_")) or name.endswith("_loop")
+
+
+class StallWatchdog:
+    """
+    Watches the event loop from another thread, keeping the last few stalls in a ring.
+    """
+    def __init__(self, threshold: float = 0.25, interval: float = 0.05, history: int = 50):
+        """
+        :param threshold: Seconds without progress that count as a stall.
+        :param interval: Seconds between heartbeats, and between checks.
+        :param history: Most stalls to remember.
+        """
+        self.threshold = threshold
+        self.interval = interval
+
+        self.stalls: collections.deque[Stall] = collections.deque(maxlen=history)
+
+        self.__beat = time.monotonic()
+        self.__handle: asyncio.TimerHandle | None = None
+        self.__loop_thread: int | None = None
+        self.__thread: threading.Thread | None = None
+        self.__stopping = threading.Event()
+
+    def start(self) -> None:
+        """ Starts watching the running loop. Call from the loop. """
+        if self.__thread is not None:
+            return
+
+        self.__loop_thread = threading.get_ident()
+        self.__stopping.clear()
+        self.__heartbeat()
+
+        self.__thread = threading.Thread(target=self.__watch, name="stall-watchdog", daemon=True)
+        self.__thread.start()
+
+    def stop(self) -> None:
+        """ Stops watching. """
+        if self.__handle is not None:
+            self.__handle.cancel()
+            self.__handle = None
+
+        if self.__thread is not None:
+            self.__stopping.set()
+            self.__thread.join()
+            self.__thread = None
+
+    def __heartbeat(self) -> None:
+        """ Runs on the loop, proving it's still turning. """
+        self.__beat = time.monotonic()
+        self.__handle = asyncio.get_running_loop().call_later(self.interval, self.__heartbeat)
+
+    def __sample(self, behind: float) -> Stall | None:
+        """ Looks at what the loop thread is doing right now. """
+        frame = sys._current_frames().get(self.__loop_thread)
+        if frame is None:
+            return None
+
+        own = []
+        stack = []
+        while frame is not None:
+            if _is_own(frame):
+                own.append(frame)
+            stack.append(frame)
+            frame = frame.f_back
+
+        # Innermost first, as walked. Blame the nearest listener or command, commands being run from inside
+        # `on_message`; failing that, the outermost of Hal's frames.
+        entry = next((frame for frame in own if _is_entry(frame)), own[-1] if own else None)
+        culprit = _name(entry) if entry is not None else "outside Hal's code"
+        innermost = _name(own[0]) if own else culprit
+        formatted = traceback.format_list(traceback.extract_stack(stack[0], limit=12))
+
+        return Stall(common.clock.time() - behind, culprit, innermost, formatted)
+
+    def __watch(self) -> None:
+        """ Runs on the watchdog thread. """
+        current = None
+
+        while not self.__stopping.wait(self.interval):
+            behind = time.monotonic() - self.__beat
+
+            if behind >= self.threshold:
+                if current is None:
+                    current = self.__sample(behind)
+                if current is not None:
+                    current.duration = behind
+
+            elif current is not None:
+                self.stalls.append(current)
+                logger.warning(f"Event loop stalled: {current}.")
+                current = None
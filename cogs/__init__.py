@@ -1,5 +1,6 @@
 implemented = (
     "dev_cog",
     "logging_cog",
+    "settings_cog",
     "social_cog"
 )
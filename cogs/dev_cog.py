@@ -1,4 +1,6 @@
+import datetime as dt
 import logging
+import typing
 
 import discord
 from discord.ext import commands
@@ -29,20 +31,35 @@ class DevCog(commands.Cog, name="Dev"):
         """
         return await self.bot.is_owner(ctx.author)
 
+    async def send_pages(self, ctx: commands.Context, title: str, lines: typing.Iterable[str]) -> None:
+        """
+        Sends a listing a page at a time, flippable by whoever asked.
+        :param ctx: Command context.
+        :param title: Listing title.
+        :param lines: Lines to list, rendered as pages are shown.
+        """
+        view = helpers.PagedView(title, lines, owner_id=ctx.author.id)
+        await common.speak_in(ctx.channel, embed=view.embed(), view=view)
+
+    def muted_lines(self) -> typing.Iterator[str]:
+        """ Muted channels, then categories and servers, named if they still resolve. """
+        # Copies, as pages are rendered later on, and mutes come and go.
+        for channel_id, value in list(self.bot.muted_channels.items()):
+            channel = self.bot.get_channel(channel_id)
+            yield f"{channel.name if channel is not None else f'Unknown channel {channel_id}'} : {value}"
+
+        for scope_id, value in list(self.bot.muted_scopes.items()):
+            if (guild := self.bot.get_guild(scope_id)) is not None:
+                yield f"{guild.name} (server) : {value}"
+            elif (category := self.bot.get_channel(scope_id)) is not None:
+                yield f"{category.name} (category) : {value}"
+            else:
+                yield f"Unknown {scope_id} : {value}"
+
     @commands.command(name="channels", help="View currently muted channels.")
     async def command_channels(self, ctx: commands.Context):
         """ Hal sends a list of muted channels. """
-        channels = [self.bot.get_channel(i) for i in common.muted_channels]
-
-        if len(channels) > 0:
-            message = "Muted channels are: \n" + \
-                      "\n".join([f"{ch.name} : {common.muted_channels[ch.id]}" for ch in channels])
-        else:
-            message = "No muted channels."
-
-        embed = helpers.InfoEmbed(message)
-
-        await common.speak_in(ctx.channel, embed=embed)
+        await self.send_pages(ctx, "Muted channels", self.muted_lines())
 
     @commands.command(name="check", help="Checks Lil Hal Jr's key phrases for reference.")
     async def command_check(self, ctx: commands.Context):
@@ -78,6 +95,39 @@ class DevCog(commands.Cog, name="Dev"):
         """
         common.emoji_confirmation(ctx.message)
 
+    @commands.command(name="stats", help="Shows Hal's health readings.")
+    async def command_stats(self, ctx: commands.Context):
+        """ Hal sends his current loop lag, latency, and event counters. """
+        readings = self.bot.health.snapshot()
+
+        await self.send_pages(ctx, "Health", (f"{name} : {value:g}" for name, value in readings.items()))
+
+    @commands.command(name="analytics", help="Shows Hal's behavior counters, overall or for one channel.",
+                      usage="[ Channel ]")
+    async def command_analytics(self, ctx: commands.Context, channel: discord.TextChannel = None):
+        """ Hal sends his counters since starting: for a channel, or totals with the most shushed channels. """
+        analytics = self.bot.analytics
+
+        if channel is not None:
+            message = f"In {channel.name}: \n" + \
+                      "\n".join(f"{name} : {count}" for name, count in analytics.channel(channel.id).items())
+        else:
+            message = "\n".join(f"{name} : {count}" for name, count in analytics.totals().items())
+
+            if shushed := analytics.top(helpers.analytics.SHUSHED, 5):
+                message += "\n\nMost shushed in: \n" + \
+                           "\n".join(f"{self.bot.get_channel(i) or i} : {count}" for i, count in shushed)
+
+        await common.speak_in(ctx.channel, embed=helpers.InfoEmbed(message))
+
+    @commands.command(name="stalls", help="Shows recent event loop stalls, and who caused them.")
+    async def command_stalls(self, ctx: commands.Context):
+        """ Hal sends his most recent stalls, newest first. """
+        stalls = list(self.bot.watchdog.stalls)[::-1]
+
+        await self.send_pages(ctx, "Stalls", (f"{dt.datetime.fromtimestamp(stall.started):%H:%M:%S} {stall}"
+                                              for stall in stalls))
+
 
 def setup(bot: LilHalJr) -> None:
     """
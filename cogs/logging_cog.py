@@ -3,7 +3,7 @@ import logging
 import discord
 from discord.ext import commands
 
-from bot import LilHalJr
+from bot import LilHalJr, Overloaded, Throttled
 
 
 logger = logging.getLogger("lilhaljr")
@@ -67,8 +67,8 @@ class LogCog(commands.Cog, name="Logs"):
     @commands.Cog.listener()
     async def on_command_error(self, ctx: commands.Context, error: commands.CommandInvokeError):
         """ Reports unhandled command error. """
-        # If the command doesn't exist, don't worry about it.
-        if isinstance(error, commands.CommandNotFound):
+        # If the command doesn't exist, was shed under load, or throttled, don't worry about it.
+        if isinstance(error, (commands.CommandNotFound, Overloaded, Throttled)):
             return
 
         logger.error(f"on {ctx.bot.command_prefix}{ctx.command.name}: {error}")
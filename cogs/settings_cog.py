@@ -0,0 +1,173 @@
+import logging
+
+from discord.ext import commands
+
+import helpers
+from bot import LilHalJr, Priority, common
+
+
+logger = logging.getLogger("lilhaljr")
+
+
+class SettingsCog(commands.Cog, name="Settings"):
+    """
+    Server admins can tune Lil Hal Jr.'s silencing phrases, emoji, and chattiness for their own server.
+    """
+    def __init__(self, bot: LilHalJr):
+        """
+        Initializes cog, connects to Hal.
+        :param bot: Expected Lil Hal Jr.
+        """
+        self.bot = bot
+
+    async def cog_check(self, ctx: commands.Context) -> bool:
+        """
+        Commands work in servers, for the developer and anyone who can manage the server.
+        :param ctx:
+        :return: True if allowed.
+        """
+        if ctx.guild is None:
+            return False
+
+        return ctx.author.guild_permissions.manage_guild or await self.bot.is_owner(ctx.author)
+
+    async def cog_command_error(self, ctx: commands.Context, error: commands.CommandError) -> None:
+        """ Bad patterns and out of range values get a thumbs down. """
+        if isinstance(error, commands.CommandInvokeError) and isinstance(error.original, (ValueError, KeyError)):
+            common.emoji_confirmation(ctx.message, thumbs_up=False)
+
+    def update(self, ctx: commands.Context, key: str, value) -> None:
+        """
+        Saves a setting for the context's guild, and confirms.
+        :param ctx: Command context.
+        :param key: Setting name.
+        :param value: New value.
+        """
+        self.bot.settings.set(ctx.guild.id, key, value)
+        common.emoji_confirmation(ctx.message)
+
+        logger.info(f"[{ctx.guild}] {ctx.author} set {key}.")
+
+    def scope(self, ctx: commands.Context, scope: str) -> tuple[dict[int, int], int]:
+        """
+        Finds where a mute of the given scope is kept.
+        :param ctx: Command context.
+        :param scope: "channel", "category" or "server".
+        :return: The bot's apprehension dictionary for the scope, and the ID to key it by.
+        """
+        scope = scope.lower()
+
+        if scope == "channel":
+            return self.bot.muted_channels, ctx.channel.id
+
+        elif scope == "category":
+            if ctx.channel.category_id is None:
+                raise commands.BadArgument("This channel isn't in a category.")
+            return self.bot.muted_scopes, ctx.channel.category_id
+
+        elif scope in ("server", "guild"):
+            return self.bot.muted_scopes, ctx.guild.id
+
+        raise commands.BadArgument("Scope is channel, category or server.")
+
+    # ==================================== COMMANDS ====================================
+    @commands.group(name="settings", help="View this server's silencing settings.", invoke_without_command=True)
+    async def command_settings(self, ctx: commands.Context):
+        """ Sends this server's phrases, emoji and reply chance. """
+        behavior = self.bot.settings.get(ctx.guild.id)
+
+        embed = helpers.PhrasesEmbed(behavior.quiet_phrases, behavior.return_phrases, behavior.quiet_emoji)
+        embed.set_footer(text=f"Reply chance: {behavior.reply_chance:.0%}")
+
+        await common.speak_in(ctx.channel, embed=embed)
+
+    @command_settings.command(name="quiet", help="Add or change a silencing phrase, with a rudeness level, 1-6.",
+                              usage="[ Level ] [ Phrase ]")
+    async def command_quiet(self, ctx: commands.Context, level: int, *, phrase: str):
+        """ Adds a silencing phrase. """
+        if not 1 <= level <= 6:
+            raise commands.BadArgument("Rudeness goes from 1 to 6.")
+
+        phrases = dict(self.bot.settings.get(ctx.guild.id).quiet_phrases)
+        phrases[phrase.lower()] = level
+
+        self.update(ctx, "quiet_phrases", phrases)
+
+    @command_settings.command(name="unquiet", help="Remove a silencing phrase.", usage="[ Phrase ]")
+    async def command_unquiet(self, ctx: commands.Context, *, phrase: str):
+        """ Removes a silencing phrase. """
+        phrases = dict(self.bot.settings.get(ctx.guild.id).quiet_phrases)
+        phrases.pop(phrase.lower())
+
+        self.update(ctx, "quiet_phrases", phrases)
+
+    @command_settings.command(name="return", help="Add an un-muting phrase.", usage="[ Phrase ]")
+    async def command_return(self, ctx: commands.Context, *, phrase: str):
+        """ Adds an un-muting phrase. """
+        phrases = list(self.bot.settings.get(ctx.guild.id).return_phrases)
+        if phrase.lower() not in phrases:
+            phrases.append(phrase.lower())
+
+        self.update(ctx, "return_phrases", phrases)
+
+    @command_settings.command(name="unreturn", help="Remove an un-muting phrase.", usage="[ Phrase ]")
+    async def command_unreturn(self, ctx: commands.Context, *, phrase: str):
+        """ Removes an un-muting phrase. """
+        phrases = list(self.bot.settings.get(ctx.guild.id).return_phrases)
+        phrases.remove(phrase.lower())
+
+        self.update(ctx, "return_phrases", phrases)
+
+    @command_settings.command(name="emoji", help="Set the silencing reaction.", usage="[ Emoji ]")
+    async def command_emoji(self, ctx: commands.Context, emoji: str):
+        """ Sets the shushing emoji. """
+        self.update(ctx, "quiet_emoji", emoji)
+
+    @command_settings.command(name="chance", help="Set how likely Hal is to chime in, 0-100%.", usage="[ Percent ]")
+    async def command_chance(self, ctx: commands.Context, percent: float):
+        """ Sets the reply chance. """
+        if not 0 <= percent <= 100:
+            raise commands.BadArgument("Chance goes from 0 to 100.")
+
+        self.update(ctx, "reply_chance", percent / 100)
+
+    @command_settings.command(name="reset", help="Go back to Hal's default settings.")
+    async def command_reset(self, ctx: commands.Context):
+        """ Drops all of this server's overrides. """
+        self.bot.settings.reset(ctx.guild.id)
+        common.emoji_confirmation(ctx.message)
+
+        logger.info(f"[{ctx.guild}] {ctx.author} reset settings.")
+
+    @commands.command(name="mute", help="Silence Hal in this channel, its category, or the whole server. Each level "
+                                        "is a quarter hour, up to 96.",
+                      usage="[ channel | category | server ] [ Level ]", extras={"priority": Priority.MUTE})
+    async def command_mute(self, ctx: commands.Context, scope: str, level: int):
+        """ Mutes Hal across a scope. A lower level never shortens an existing mute. """
+        if not 1 <= level <= 96:
+            raise commands.BadArgument("Levels go from 1 to 96.")
+
+        muted, muted_id = self.scope(ctx, scope)
+        muted[muted_id] = max(muted.get(muted_id, 0), level)
+        common.emoji_confirmation(ctx.message)
+
+        logger.info(f"[{ctx.guild}] {ctx.author} muted Hal in this {scope.lower()}, level {level}.")
+
+    @commands.command(name="unmute", help="Let Hal speak in this channel, its category, or the whole server again.",
+                      usage="[ channel | category | server ]", extras={"priority": Priority.MUTE})
+    async def command_unmute(self, ctx: commands.Context, scope: str):
+        """ Lifts a mute of the given scope. Narrower and wider mutes stay. """
+        muted, muted_id = self.scope(ctx, scope)
+        muted.pop(muted_id, None)
+        common.emoji_confirmation(ctx.message)
+
+        logger.info(f"[{ctx.guild}] {ctx.author} unmuted Hal in this {scope.lower()}.")
+
+
+def setup(bot: LilHalJr) -> None:
+    """
+    Set up function for load_extension.
+    :param bot: Expecting Lil Hal Jr.
+    :return: No return value.
+    """
+    bot.add_cog(SettingsCog(bot))
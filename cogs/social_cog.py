@@ -1,4 +1,5 @@
 import asyncio
+import functools
 import logging
 import random
 import typing
@@ -6,7 +7,7 @@ import typing
 import discord
 from discord.ext import commands, tasks
 
-from bot import LilHalJr, common
+from bot import LilHalJr, OnboardingQueue, Priority, common
 import config
 import helpers
 
@@ -20,22 +21,41 @@ class SocialCog(commands.Cog, name="Social"):
 
     def __init__(self, bot: LilHalJr):
         self.bot = bot
+        self.pending_greetings = helpers.PendingGreetings(config.GREETING_WINDOW, config.GREETING_INTERVAL)
+        self.joins = {}
+        self.channel_index = helpers.ChannelIndex()
+        self.onboarding = OnboardingQueue(config.ONBOARDING_LIMIT, config.ONBOARDING_GUILD_LIMIT,
+                                          config.ONBOARDING_BACKLOG)
 
         self.bot_interaction_loop.start()
 
     # ==================================== HELPER OPERATIONS ====================================
-    @staticmethod
-    def __find_channel_by_keyword(guild: discord.Guild, keyword: str) -> discord.TextChannel | None:
+    def __find_channel_by_keyword(self, guild: discord.Guild, keyword: str) -> discord.TextChannel | None:
         """
         Finds a channel in a given guild with a very simple keyword search.
         :param guild: Guild to search.
         :param keyword: Keyword to use.
         :return: Matching channel, if any. None otherwise.
         """
-        for channel in guild.text_channels:
-            if channel.can_send(discord.Message) and keyword.lower() in channel.name.lower():
+        for channel_id in self.channel_index.find(guild, keyword):
+            channel = guild.get_channel(channel_id)
+            if channel is not None and self.bot.permissions.can_send(channel):
                 return channel
 
+    def greet(self, channel: discord.TextChannel, content: str, low: int, high: int) -> bool:
+        """
+        Queues a greeting or introduction, after a pause. The pause is waited out before the message joins the
+        onboarding queue, so only sending it takes a turn.
+        :param channel: Channel to speak in.
+        :param content: What to say.
+        :param low: Shortest pause, in seconds.
+        :param high: Longest pause, in seconds.
+        :return: False if the onboarding backlog was full, and nothing was queued.
+        """
+        return self.onboarding.submit(channel.guild.id,
+                               functools.partial(common.speak_in, channel, content, show_typing=False),
+                               delay=common.pause_time(low, high))
+
     async def find_quiet_channel(self, condition: typing.Callable[[discord.TextChannel], bool] = None) \
             -> discord.TextChannel:
         """
@@ -46,25 +66,21 @@ class SocialCog(commands.Cog, name="Social"):
 
         def name_check(ch: discord.TextChannel) -> bool:
             """ This ensures the given channel is appropriate to chat in. """
-            return "intro" not in ch.name.lower() and "vent" not in ch.name.lower()
+            return self.channel_index.keywords_of(ch).isdisjoint(("intro", "vent"))
 
         def validate(ch: discord.TextChannel) -> bool:
             """ Tests the given channel. """
             test = condition(ch) if condition else True  # Condition can be None, be wary.
-            return ch.can_send(discord.Message) and test and name_check(ch)
+            return self.bot.permissions.can_send(ch) and test and name_check(ch)
 
         # Get a list of candidate channels. Checks home guild first.
         home_guild = self.bot.get_guild(config.HOME_GUILD)
         secret_guild = self.bot.get_guild(config.SECRET_GUILD)
         channels = list(filter(validate, home_guild.text_channels + secret_guild.text_channels))
 
-        def channel_check(ch: discord.TextChannel, *_) -> bool:
-            """ Checks if the typing channel is in the list. """
-            return ch in channels
-
         while len(channels) > 0:
             try:
-                typing_result = await self.bot.wait_for("typing", check=channel_check, timeout=10)
+                typing_result = await self.bot.wait_for_channel("typing", [ch.id for ch in channels], timeout=10)
                 channels.remove(typing_result[0])
 
             except asyncio.TimeoutError:
@@ -83,7 +99,7 @@ class SocialCog(commands.Cog, name="Social"):
         while True:
             try:
                 wait = random.randint(9, 25) + random.random()
-                await self.bot.wait_for("typing", check=lambda c, u, w: c == channel, timeout=wait)
+                await self.bot.wait_for_channel("typing", channel.id, timeout=wait)
 
             # Loop breaks, return.
             except asyncio.TimeoutError:
@@ -99,62 +115,91 @@ class SocialCog(commands.Cog, name="Social"):
         # Say hello
         channel = self.__find_channel_by_keyword(guild, "general")
         if channel is not None:
-            asyncio.create_task(common.say_hello(channel))
+            self.greet(channel, self.bot.persona.hello, 5, 10)
 
         # Introduce self.
         channel = self.__find_channel_by_keyword(guild, "intro")
         if channel is not None:
-            asyncio.create_task(common.introduce_self(channel))
+            self.greet(channel, self.bot.persona.introduction, 20, 25)
+
+    @commands.Cog.listener()
+    async def on_guild_remove(self, guild: discord.Guild):
+        """ Forgets the guild's channels, and any greetings still waiting. """
+        self.channel_index.remove_guild(guild)
+        self.onboarding.cancel(guild.id)
+
+    @commands.Cog.listener()
+    async def on_guild_available(self, guild: discord.Guild):
+        """ After a reconnect, channel events may have been missed. Re-indexes when next needed. """
+        self.channel_index.remove_guild(guild)
+
+    # Channel index upkeep.
+    @commands.Cog.listener()
+    async def on_guild_channel_create(self, channel: discord.abc.GuildChannel):
+        self.channel_index.update(channel)
+
+    @commands.Cog.listener()
+    async def on_guild_channel_update(self, before: discord.abc.GuildChannel, after: discord.abc.GuildChannel):
+        if before.name != after.name or before.position != after.position:
+            self.channel_index.update(after)
+
+    @commands.Cog.listener()
+    async def on_guild_channel_delete(self, channel: discord.abc.GuildChannel):
+        self.channel_index.remove(channel)
 
     @commands.Cog.listener()
     async def on_member_join(self, member: discord.Member):
         """
-        Hal says hello to a new person.
+        Hal waits for a new person to say something, to say hello.
         :param member: Joining member.
         """
-        # A place to save the channel.
-        channel = []
+        self.pending_greetings.add(member.guild.id, member.id, common.clock.time())
 
-        def check(m: discord.Message) -> bool:
-            """ Checks that a message is from the new member. """
-            result = m.author == member and m.guild == member.guild and "intro" not in m.channel.name.lower()
-
-            # Save the channel.
-            if result:
-                channel.append(m.channel)
+    def greet_newcomer(self, message: discord.Message) -> None:
+        """
+        Says hello if the message is a new member's first words, outside of an intro channel. When load sheds the
+        hello, or the onboarding queue is full, the member stays on the table and the guild's limit goes unspent.
+        :param message: Any guild message.
+        """
+        if "intro" in self.channel_index.keywords_of(message.channel):
+            return
 
-            return result
+        now = common.clock.time()
+        if not self.pending_greetings.is_waiting(message.guild.id, message.author.id, now):
+            return
 
-        # Wait for them to say something.
-        try:
-            await self.bot.wait_for("message", check=check, timeout=60)
-        except asyncio.TimeoutError:  # If they don't, no big deal.
+        # One hello covers a whole wave of new members.
+        if not self.pending_greetings.may_greet(message.guild.id, now):
+            self.pending_greetings.pop(message.guild.id, message.author.id, now)
             return
 
-        # Grab the saved channel and say hello.
-        channel = channel[0]
-        await common.say_hello(channel)
+        if self.bot.governor.allows(Priority.AMBIENT) and self.greet(message.channel, self.bot.persona.hello, 5, 10):
+            self.pending_greetings.pop(message.guild.id, message.author.id, now)
+            self.pending_greetings.greeted(message.guild.id, now)
 
     @commands.Cog.listener()
     async def on_message(self, message: discord.Message) -> None:
         """
         Certain social interactions on message.
         """
-        if message.content.lower().startswith("%toast"):
+        if message.guild is not None:
+            self.greet_newcomer(message)
+
+        if message.content.lower().startswith("%toast") and self.bot.governor.allows(Priority.AMBIENT):
             print("toast happening...")
 
             async def callback() -> None:
-                """ A callback for the Join instance to fire."""
-                await common.speak_in(message.channel, "%Toast")
+                """ A callback for the Join instance to fire. Counts the join only if Hal actually posts. """
+                if await common.speak_in(message.channel, "%Toast") is not None:
+                    self.bot.analytics.count(helpers.analytics.JOINED, message.channel.id)
 
             async def complete() -> None:
                 """ A callback that returns when the Join can be deleted. """
-                await self.bot.wait_for("message",
-                                        check=lambda m: m.author.id == config.CRANEBOT_ID
-                                        and m.channel == message.channel)
+                await self.bot.wait_for_channel("message", message.channel.id,
+                                                check=lambda m: m.author.id == config.CRANEBOT_ID)
 
             # Create a custom event that
-            helpers.Join.get(message.channel, callback, complete).call()
+            helpers.Join.get(message.channel, callback, complete, directory=self.joins).call()
 
     # @commands.Cog.listener()
     # async def on_command_error(self, ctx: commands.Context, error: commands.CommandError):
@@ -182,6 +227,11 @@ class SocialCog(commands.Cog, name="Social"):
         # Shuffle interactions.
         random.shuffle(bot_info)  # Commented out until there are more bots to interact with.
 
+        # Postponed to the next run when busy.
+        if not self.bot.governor.allows(Priority.AMBIENT):
+            logger.info("Under load, postponing bot interactions.")
+            bot_info.clear()
+
         for info in bot_info:
             result = await self.bot_command_interaction(*info)
 
@@ -227,7 +277,7 @@ class SocialCog(commands.Cog, name="Social"):
 
         def msg_check(m: discord.Message) -> bool:
             """ For checking that the command yields a response. """
-            return (m.author.id == bot_id or m.author.bot) and m.channel == channel
+            return m.author.id == bot_id or m.author.bot
 
         # Use a couple commands, waiting for responses in between.
         coms = random.choices(command_list, k=random.randint(1, 3), weights=command_weights)
@@ -260,13 +310,16 @@ class SocialCog(commands.Cog, name="Social"):
 
             await self.wait_until_quiet(channel)
             await common.speak_in(channel, command_usage)
+            self.bot.analytics.count(helpers.analytics.BOT_COMMAND, channel.id)
 
             # Wait for a response.
             try:
-                await self.bot.wait_for("message", check=msg_check, timeout=random.randint(10, 25))
+                await self.bot.wait_for_channel("message", channel.id, check=msg_check,
+                                                timeout=random.randint(10, 25))
 
             # Be sad if there is none, return value indicating no response.
             except asyncio.TimeoutError:
+                self.bot.analytics.count(helpers.analytics.IGNORED, channel.id)
                 await common.speak_in(channel, helpers.disappointment())
                 return False
 
@@ -5,6 +5,33 @@ TOASTY_ID = 208946659361554432
 SECRET_GUILD = 567541770943070236
 HOME_GUILD = 944731867570143264
 
+# Local health check server. Port 0 turns it off.
+HEALTH_HOST = "127.0.0.1"
+HEALTH_PORT = 8080
+LAG_THRESHOLD = 1.0  # Seconds of event loop lag before Hal reports not ready.
+
+# Runtime profile, see bot/runtime.py. Each switch falls back to the stock behavior if its package isn't installed.
+# All off until tools/profiles.py, or a real recording, shows one is worth it for Hal's traffic.
+USE_UVLOOP = False
+USE_ORJSON = False
+GATEWAY_COMPRESSION = False
+
+# Blocking-call detection. The event loop going this many seconds without progress is logged as a stall, blamed on the
+# listener or command that was running. The last STALL_HISTORY stalls show up in ^stalls.
+STALL_THRESHOLD = 0.25
+STALL_HISTORY = 50
+
+# Gateway event recording, off by default. Message content is "keep", "hash" (salted with the RECORD_SALT environment
+# variable) or "drop". Files rotate at RECORD_MAX_BYTES, compressed. Format documented in bot/recorder.py.
+RECORD_EVENTS = False
+RECORD_DIRECTORY = "recordings"
+RECORD_MAX_BYTES = 64 * 1024 * 1024
+RECORD_CONTENT = "hash"
+
+# Load shedding stages: optional chatter first, then commands, then owner commands. Muting is never shed.
+SHED_LAG_LIMITS = (0.25, 0.5, 1.0)  # Average loop lag, in seconds.
+SHED_BACKLOG_LIMITS = (250, 500, 1000)  # Busy event handlers, not counting those waiting for a lull.
+
 # Help message
 HELP_MESSAGE = "It seems you have asked about Crane's parody-auto-responder Discord bot. " \
                "This is an application designed to simulate the ice-cold and magnetic conversational styling of " \
@@ -13,7 +40,7 @@ HELP_MESSAGE = "It seems you have asked about Crane's parody-auto-responder Disc
                "ass, just for you."
 
 # Each phrase is configured in lowercase, and mapped to its rudeness level, 1-5. Or 6...
-# Working on regex support...
+# Phrases with \b are patterns: letters with +, * or ?, and \b. See helpers/phrases.py.
 quiet_phrases = {
     "quiet down": 1,
     r"\bs+h+\b": 1,
@@ -36,6 +63,57 @@ return_phrases = [
 ]
 
 QUIET_EMOJI = "🤫"
+QUIET_EMOJI_VALUE = 4  # Apprehension added per shushing reaction.
+
+# Seconds a new member has to speak up for a hello, and the minimum seconds between hellos in one guild.
+GREETING_WINDOW = 60
+GREETING_INTERVAL = 120
+
+# Greetings and introductions queue up, with at most this many being sent at once overall, and per guild. Their pauses
+# don't take a turn. Past the backlog, they're dropped.
+ONBOARDING_LIMIT = 4
+ONBOARDING_GUILD_LIMIT = 1
+ONBOARDING_BACKLOG = 1000
+
+# Chance that Hal chimes in when a conversation goes quiet.
+REPLY_CHANCE = 1.0
+
+# Command throttling. By command name, then "user", "channel" or "guild": at most this many uses per this many seconds.
+# Commands without their own limits use "default". The owner's commands and muting aren't throttled.
+THROTTLE_LIMITS = {
+    "default": {"user": (5, 30), "channel": (10, 30), "guild": (30, 60)},
+    "help": {"user": (2, 30), "channel": (4, 30), "guild": (10, 60)},
+    "inquire": {"user": (3, 30), "channel": (6, 30), "guild": (20, 60)},
+    "kiss": {"user": (2, 60), "channel": (4, 60), "guild": (10, 60)},
+    "scrabble": {"user": (2, 30), "channel": (4, 30), "guild": (10, 60)},
+}
+THROTTLE_EMOJI = "⏳"
+
+# Shortest and longest seconds Hal waits for a lull, scaled to how fast a channel usually moves. Past FAST_CHANNEL_RATE
+# messages per second, he doesn't wait for one at all.
+REPLY_WINDOW = (5, 12)
+FAST_CHANNEL_RATE = 0.5
+
+# Per-guild overrides of the phrases, emoji and chance above, and how many guilds' compiled settings to keep at once.
+GUILD_SETTINGS_FILE = "guild_settings.json"
+GUILD_SETTINGS_CACHE = 256
+
+# Behavior counters, written as CSV rows of what changed every ANALYTICS_INTERVAL minutes. None only keeps them live.
+ANALYTICS_FILE = "analytics.csv"
+ANALYTICS_INTERVAL = 15
+
+# How many of Hal's own messages to remember, for shushing reactions on older messages.
+SENT_MESSAGE_MEMORY = 50_000
+
+# Clients to run, all on one event loop. Keys are `bot.Persona` arguments; anything left out is Hal's. Each extra
+# persona needs its own token variable, and its own settings file, health port (or 0), recording folder and analytics
+# file (or None). For example:
+#     {"name": "Sal", "token_variable": "SAL_TOKEN", "prefix": "$", "cogs": ("dev_cog", "social_cog"),
+#      "catchphrases": ("Sure.", "Right."), "settings_file": "guild_settings_sal.json", "health_port": 0,
+#      "record_directory": "recordings/sal", "analytics_file": "analytics_sal.csv"}
+PERSONAS = [
+    {"name": "Hal"},
+]
 
 
 bad_words = [
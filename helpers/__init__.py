@@ -1,7 +1,15 @@
+from .activity import ActivityTracker
+from .analytics import Analytics
+from .channel_index import ChannelIndex
 from .dialogue import *
+from .greetings import PendingGreetings
 from .help_command import *
 from .join import Join
+from .message_index import MessageIndex
 from .number import *
-from .scrabble import Scrabble
+from .phrases import PhraseMatcher
+from .permissions import PermissionCache
+from .scrabble import Scrabble, is_safe_letters
 from .text import *
+from .throttle import CommandThrottle
 from .views import *
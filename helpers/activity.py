@@ -0,0 +1,121 @@
+"""
+    Streaming statistics on how fast each channel moves, for deciding how long Hal waits before chiming in. Constant
+    memory per channel, constant time per event.
+"""
+import math
+import random
+
+
+class ChannelActivity:
+    """
+    One channel's pace: smoothed gaps between messages and between typing events, and a decaying message rate.
+    """
+    __slots__ = ("last_message", "last_typing", "message_gap", "typing_gap", "rate")
+
+    def __init__(self):
+        self.last_message = math.nan
+        self.last_typing = math.nan
+        self.message_gap = math.nan
+        self.typing_gap = math.nan
+        self.rate = 0.0
+
+
+class ActivityTracker:
+    """
+    Channel activity by channel ID.
+    """
+    def __init__(self, smoothing: float = 0.2, rate_window: float = 60, reply_window: tuple[float, float] = (5, 12),
+                 fast_rate: float = 0.5):
+        """
+        Prepares an empty tracker.
+        :param smoothing: Weight of each new gap in the averages.
+        :param rate_window: Seconds over which the message rate decays.
+        :param reply_window: Shortest and longest seconds to wait for a lull.
+        :param fast_rate: Messages per second past which a channel is too fast to get a word in.
+        """
+        self.smoothing = smoothing
+        self.rate_window = rate_window
+        self.window = reply_window
+        self.fast_rate = fast_rate
+
+        self.__channels: dict[int, ChannelActivity] = {}
+
+    def __len__(self) -> int:
+        return len(self.__channels)
+
+    def __get(self, channel_id: int) -> ChannelActivity:
+        activity = self.__channels.get(channel_id)
+        if activity is None:
+            activity = self.__channels[channel_id] = ChannelActivity()
+        return activity
+
+    def __smooth(self, average: float, gap: float) -> float:
+        return gap if math.isnan(average) else average + (gap - average) * self.smoothing
+
+    # ==================================== EVENTS ====================================
+    def message(self, channel_id: int, now: float) -> None:
+        """ Counts a message in a channel. """
+        activity = self.__get(channel_id)
+
+        if not math.isnan(activity.last_message):
+            gap = now - activity.last_message
+            activity.message_gap = self.__smooth(activity.message_gap, gap)
+            activity.rate *= math.exp(-gap / self.rate_window)
+
+        activity.rate += 1 / self.rate_window
+        activity.last_message = now
+
+    def typing(self, channel_id: int, now: float) -> None:
+        """ Counts someone typing in a channel. """
+        activity = self.__get(channel_id)
+
+        if not math.isnan(activity.last_typing):
+            activity.typing_gap = self.__smooth(activity.typing_gap, now - activity.last_typing)
+
+        activity.last_typing = now
+
+    def dispatch(self, event: str, args: tuple, now: float) -> None:
+        """
+        Counts a gateway event, if it's a message or typing.
+        :param event: Event name, without "on_".
+        :param args: The event's arguments.
+        :param now: The current time.
+        """
+        if event == "message":
+            self.message(args[0].channel.id, now)
+        elif event == "typing":
+            self.typing(args[0].id, now)
+
+    def forget_channels(self, channel_ids: set[int]) -> None:
+        """ Drops channels, like those of a guild Hal left. """
+        for channel_id in channel_ids:
+            self.__channels.pop(channel_id, None)
+
+    # ==================================== QUERIES ====================================
+    def rate(self, channel_id: int, now: float) -> float:
+        """
+        :return: Recent messages per second in a channel.
+        """
+        activity = self.__channels.get(channel_id)
+        if activity is None or math.isnan(activity.last_message):
+            return 0.0
+
+        return activity.rate * math.exp(-(now - activity.last_message) / self.rate_window)
+
+    def reply_window(self, channel_id: int, now: float) -> float | None:
+        """
+        How long to wait for a lull before chiming in: a bit longer than the channel's usual gaps, within limits.
+        :return: Seconds to wait, or None if the channel is moving too fast to bother.
+        """
+        if self.rate(channel_id, now) > self.fast_rate:
+            return None
+
+        low, high = self.window
+        activity = self.__channels.get(channel_id)
+        gaps = [] if activity is None else [g for g in (activity.message_gap, activity.typing_gap) if not math.isnan(g)]
+
+        # Nothing known yet, the old way.
+        if not gaps:
+            return random.uniform(low, high)
+
+        return min(max(max(gaps) * 1.5, low), high) + random.random()
@@ -0,0 +1,127 @@
+"""
+    Behavior counters: how often Hal speaks, gets shushed, gets un-muted, or gets ignored by other bots, per channel.
+
+    Counters live in one flat array of fixed-width integers, a row per channel and a column per event. Channel IDs are
+    interned into rows the first time they're seen, so counting is two index operations. Snapshots are plain array
+    copies, cheap enough to take on the event loop; turning them into CSV happens wherever `write_csv` is called.
+"""
+import array
+import csv
+import os
+
+# Events, as column numbers.
+SPOKE, SHUSHED, UNMUTED, BOT_COMMAND, IGNORED, JOINED = range(6)
+EVENTS = ("spoke", "shushed", "unmuted", "bot_command", "ignored", "joined")
+
+_EMPTY_ROW = array.array("Q", [0] * len(EVENTS))
+
+
+class Snapshot:
+    """
+    A copy of the counters at a point in time.
+    """
+    __slots__ = ("time", "channels", "counts")
+
+    def __init__(self, time: float, channels: array.array, counts: array.array):
+        self.time = time
+        self.channels = channels
+        self.counts = counts
+
+
+class Analytics:
+    """
+    Event counters by channel, since Hal started.
+    """
+    def __init__(self):
+        self.__rows: dict[int, int] = {}
+        self.__channels = array.array("Q")
+        self.__counts = array.array("Q")
+
+    def __len__(self) -> int:
+        """ Channels counted. """
+        return len(self.__channels)
+
+    def count(self, event: int, channel_id: int) -> None:
+        """
+        Counts one event.
+        :param event: Event column, like `SPOKE`.
+        :param channel_id: Where it happened.
+        """
+        row = self.__rows.get(channel_id)
+        if row is None:
+            row = self.__intern(channel_id)
+
+        self.__counts[row * len(EVENTS) + event] += 1
+
+    def __intern(self, channel_id: int) -> int:
+        row = self.__rows[channel_id] = len(self.__channels)
+        self.__channels.append(channel_id)
+        self.__counts.extend(_EMPTY_ROW)
+        return row
+
+    # ==================================== QUERIES ====================================
+    def channel(self, channel_id: int) -> dict[str, int]:
+        """
+        :return: A channel's counts by event name. All zero if never counted.
+        """
+        row = self.__rows.get(channel_id)
+        if row is None:
+            return dict.fromkeys(EVENTS, 0)
+
+        start = row * len(EVENTS)
+        return dict(zip(EVENTS, self.__counts[start:start + len(EVENTS)]))
+
+    def totals(self) -> dict[str, int]:
+        """
+        :return: Counts across all channels, by event name.
+        """
+        return {name: sum(self.__counts[event::len(EVENTS)]) for event, name in enumerate(EVENTS)}
+
+    def top(self, event: int, amount: int = 10) -> list[tuple[int, int]]:
+        """
+        :return: The channels with the most of an event, as (channel ID, count), most first.
+        """
+        counts = self.__counts[event::len(EVENTS)]
+        rows = sorted((row for row in range(len(counts)) if counts[row]), key=counts.__getitem__, reverse=True)
+
+        return [(self.__channels[row], counts[row]) for row in rows[:amount]]
+
+    # ==================================== SNAPSHOTS ====================================
+    def snapshot(self, time: float) -> Snapshot:
+        """
+        Copies the counters.
+        :param time: When the snapshot was taken.
+        """
+        return Snapshot(time, self.__channels[:], self.__counts[:])
+
+
+def write_csv(path: str, before: Snapshot | None, after: Snapshot) -> int:
+    """
+    Appends what changed between two snapshots as CSV rows: bucket start, bucket end, channel ID, event, count. Does
+    file work, so call it off the event loop.
+    :param path: CSV file. Gets a header if new.
+    :param before: The previous snapshot, or None for everything in `after`.
+    :param after: The newer snapshot.
+    :return: Rows written.
+    """
+    width = len(EVENTS)
+    old = before.counts if before is not None else array.array("Q")
+    start = int(before.time) if before is not None else ""
+
+    rows = []
+    for row, channel_id in enumerate(after.channels):
+        for event in range(width):
+            i = row * width + event
+            delta = after.counts[i] - (old[i] if i < len(old) else 0)
+            if delta:
+                rows.append((start, int(after.time), channel_id, EVENTS[event], delta))
+
+    if rows:
+        new = not os.path.exists(path)
+        with open(path, "a", newline="", encoding="utf-8") as file:
+            writer = csv.writer(file)
+            if new:
+                writer.writerow(("start", "end", "channel", "event", "count"))
+            writer.writerows(rows)
+
+    return len(rows)
@@ -0,0 +1,99 @@
+"""
+    An index of text channels by the keywords in their names, per guild, so finding "general" or skipping "vent" is a
+    lookup rather than a scan. Guilds are indexed the first time they're asked about, then kept up to date from channel
+    events.
+"""
+import discord
+
+
+class ChannelIndex:
+    """
+    Text channel IDs by guild and keyword, and each indexed channel's keywords.
+    """
+    def __init__(self, keywords: tuple[str, ...] = ("general", "intro", "vent")):
+        """
+        Prepares an empty index.
+        :param keywords: Lowercase keywords to look for in channel names.
+        """
+        self.keywords = keywords
+
+        # Guild ID -> keyword -> channel ID -> sort key, in Discord's channel order.
+        self.__guilds: dict[int, dict[str, dict[int, tuple[int, int]]]] = {}
+        self.__channels: dict[int, frozenset[str]] = {}
+
+    def __len__(self) -> int:
+        return len(self.__guilds)
+
+    # ==================================== UPDATES ====================================
+    def add_guild(self, guild: discord.Guild) -> None:
+        """ Indexes every text channel in a guild, replacing anything indexed before. """
+        self.remove_guild(guild)
+        self.__guilds[guild.id] = {}
+
+        for channel in guild.text_channels:
+            self.__add(channel)
+
+    def remove_guild(self, guild: discord.Guild) -> None:
+        """ Forgets a guild. """
+        index = self.__guilds.pop(guild.id, None)
+        if index is None:
+            return
+
+        for channels in index.values():
+            for channel_id in channels:
+                self.__channels.pop(channel_id, None)
+
+    def update(self, channel: discord.abc.GuildChannel) -> None:
+        """ Re-indexes a created or changed channel, if its guild is indexed. """
+        if channel.guild.id not in self.__guilds:
+            return
+
+        self.remove(channel)
+        if isinstance(channel, discord.TextChannel):
+            self.__add(channel)
+
+    def remove(self, channel: discord.abc.GuildChannel) -> None:
+        """ Forgets a deleted channel. """
+        keywords = self.__channels.pop(channel.id, None)
+        index = self.__guilds.get(channel.guild.id)
+
+        if keywords and index is not None:
+            for keyword in keywords:
+                index[keyword].pop(channel.id, None)
+
+    def __add(self, channel: discord.TextChannel) -> None:
+        keywords = self.__match(channel.name)
+        self.__channels[channel.id] = keywords
+
+        index = self.__guilds[channel.guild.id]
+        for keyword in keywords:
+            index.setdefault(keyword, {})[channel.id] = (channel.position, channel.id)
+
+    def __match(self, name: str) -> frozenset[str]:
+        name = name.lower()
+        return frozenset(keyword for keyword in self.keywords if keyword in name)
+
+    # ==================================== LOOKUPS ====================================
+    def find(self, guild: discord.Guild, keyword: str) -> list[int]:
+        """
+        Finds channels with a keyword in their names.
+        :param guild: Guild to look in.
+        :param keyword: One of the index's keywords.
+        :return: Matching channel IDs, in channel list order.
+        """
+        if guild.id not in self.__guilds:
+            self.add_guild(guild)
+
+        channels = self.__guilds[guild.id].get(keyword, {})
+        return sorted(channels, key=channels.__getitem__)
+
+    def keywords_of(self, channel: discord.abc.GuildChannel | discord.Thread) -> frozenset[str]:
+        """
+        Threads, forums and other channels the index doesn't hold are matched by name on the spot.
+        :return: The keywords in a channel's name.
+        """
+        if channel.guild.id not in self.__guilds:
+            self.add_guild(channel.guild)
+
+        keywords = self.__channels.get(channel.id)
+        return keywords if keywords is not None else self.__match(channel.name)
@@ -1,4 +1,5 @@
 import random
+import typing
 
 import discord
 
@@ -6,12 +7,16 @@ from .number import random_number
 from .text import clean_string
 
 
-def basic() -> str:
-    """ Returns Lil Hal Junior's famous catchphrase. """
+def basic(catchphrases: typing.Sequence[str] = ("Hmm.", "Yes.", "Interesting."), rare: str = "Oh.") -> str:
+    """
+    Returns Lil Hal Junior's famous catchphrase. Or another persona's.
+    :param catchphrases: Catchphrases to pick from.
+    :param rare: The one in two hundred.
+    """
     if not random.randint(0, 199):
-        return "Oh."
+        return rare
 
-    return random.choice(["Hmm.", "Yes.", "Interesting."])
+    return random.choice(catchphrases)
 
 
 def existential_question() -> str:
@@ -0,0 +1,94 @@
+"""
+    A table of new members Hal is waiting to say hello to, so joins don't each need their own message listener.
+"""
+
+
+class PendingGreetings:
+    """
+    New members by (guild ID, member ID), each with an expiry. Entries expire in the order they're added, so expired
+    ones are always at the front and get swept together.
+    """
+    def __init__(self, window: float = 60, interval: float = 120):
+        """
+        Prepares an empty table.
+        :param window: Seconds a new member has to say something.
+        :param interval: Minimum seconds between greetings in the same guild.
+        """
+        self.window = window
+        self.interval = interval
+
+        self.__pending: dict[tuple[int, int], float] = {}
+        self.__last_greeting: dict[int, float] = {}
+
+    def __len__(self) -> int:
+        return len(self.__pending)
+
+    def add(self, guild_id: int, member_id: int, now: float) -> None:
+        """
+        Starts waiting for a new member.
+        :param guild_id: The guild they joined.
+        :param member_id: The new member.
+        :param now: The current time.
+        """
+        self.sweep(now)
+
+        # Re-inserting keeps the table in expiry order.
+        self.__pending.pop((guild_id, member_id), None)
+        self.__pending[(guild_id, member_id)] = now + self.window
+
+    def is_waiting(self, guild_id: int, member_id: int, now: float) -> bool:
+        """
+        Checks on a member without stopping the wait.
+        :return: True if the member is waiting for a hello, and still in time.
+        """
+        expiry = self.__pending.get((guild_id, member_id))
+        return expiry is not None and expiry > now
+
+    def pop(self, guild_id: int, member_id: int, now: float) -> bool:
+        """
+        Stops waiting for a member, if they were being waited on.
+        :return: True if the member was waiting for a hello, and still in time.
+        """
+        expiry = self.__pending.pop((guild_id, member_id), None)
+        return expiry is not None and expiry > now
+
+    def sweep(self, now: float) -> int:
+        """
+        Drops every expired entry.
+        :param now: The current time.
+        :return: How many entries were dropped.
+        """
+        swept = 0
+
+        while self.__pending:
+            key = next(iter(self.__pending))
+            if self.__pending[key] > now:
+                break
+
+            del self.__pending[key]
+            swept += 1
+
+        # Forget guilds that haven't been greeted in a while, too.
+        if swept:
+            for guild_id in [g for g, last in self.__last_greeting.items() if last + self.interval <= now]:
+                del self.__last_greeting[guild_id]
+
+        return swept
+
+    def may_greet(self, guild_id: int, now: float) -> bool:
+        """
+        Checks the per-guild greeting limit. Nothing is counted until `greeted()`.
+        :param guild_id: The guild to greet in.
+        :param now: The current time.
+        :return: True if Hal may say hello.
+        """
+        last = self.__last_greeting.get(guild_id)
+        return last is None or now - last >= self.interval
+
+    def greeted(self, guild_id: int, now: float) -> None:
+        """
+        Counts a greeting against the guild's limit.
+        :param guild_id: The guild greeted.
+        :param now: The current time.
+        """
+        self.__last_greeting[guild_id] = now
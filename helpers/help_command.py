@@ -10,14 +10,13 @@ class LilHalJrHelp(commands.HelpCommand):
     """
     Lil Hal Jr's help command.
     """
-    def __init__(self, bot, **options):
+    def __init__(self, **options):
         """
-        Initializes and connects Lil Hal Jr directly.
-        :param bot: Expects Lil Hal Jr.
+        Initializes the help command. Hal is reached through `self.context.bot` when it runs, since py-cord deep-copies
+        everything passed in here, once now and again on every invocation.
         :param options: Arbitrary options.
         """
         super().__init__(**options)
-        self.bot = bot
 
     async def command_callback(self, ctx: commands.Context, *, command: str = None) -> None:
         """
@@ -30,7 +29,7 @@ class LilHalJrHelp(commands.HelpCommand):
         if command is not None:
             command = command.lower()
 
-        if command in ["dev", "social", "logging"]:
+        if command in ["dev", "social", "logging", "settings"]:
             command = command.capitalize()
 
         # Carry on.
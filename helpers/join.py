@@ -15,29 +15,36 @@ CURRENT_DIR: dict[int, Join] = {}
 
 class Join:
     @classmethod
-    def get(cls, channel: discord.TextChannel, *args, **kwargs) -> Join:
+    def get(cls, channel: discord.TextChannel, *args, directory: dict[int, Join] = None, **kwargs) -> Join:
         """
         Fetches/creates a Join for the given channel.
         :param channel: The given channel.
+        :param directory: Where to keep Joins by channel. Each client running alongside others needs its own.
         :return: An instance of Join.
         """
+        if directory is None:
+            directory = CURRENT_DIR
+
         # Create new if it doesn't exist.
-        if channel.id not in CURRENT_DIR.keys():
-            CURRENT_DIR[channel.id] = cls(channel, *args, **kwargs)
-            asyncio.create_task(CURRENT_DIR[channel.id].await_and_terminate())  # Begin process.
+        if channel.id not in directory.keys():
+            directory[channel.id] = cls(channel, *args, directory=directory, **kwargs)
+            asyncio.create_task(directory[channel.id].await_and_terminate())  # Begin process.
 
         # Increase call count and return
-        return CURRENT_DIR[channel.id]
+        return directory[channel.id]
 
     def __init__(self, channel: discord.TextChannel,
                  callback: typing.Callable,
-                 end_on: typing.Callable[[], typing.Coroutine]):
+                 end_on: typing.Callable[[], typing.Coroutine],
+                 directory: dict[int, Join] = None):
         """
         Initializes a Join event
         :param callback: A callable function to be triggered.
         :param end_on: A coroutine that will return when the instance can be removed.
+        :param directory: The directory this Join is kept in.
         """
         self.channel_id = channel.id
+        self.directory = CURRENT_DIR if directory is None else directory
         self.__callback = callback
         self.__end_on = end_on
 
@@ -66,4 +73,4 @@ class Join:
         # Set flag, await, and pop.
         self.__awaiting_termination = True
         await self.__end_on()
-        CURRENT_DIR.pop(self.channel_id)
+        self.directory.pop(self.channel_id)
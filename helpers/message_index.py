@@ -0,0 +1,75 @@
+"""
+    A compact, bounded index of messages Hal has sent, so reactions on old messages can still be recognized without
+    keeping the messages themselves in the client's cache.
+"""
+import array
+import bisect
+
+
+class MessageIndex:
+    """
+    Sorted parallel arrays of message IDs and their channel IDs. Discord IDs are snowflakes, which grow over time, so
+    new messages almost always append to the end. Roughly 16 bytes per message.
+    """
+    def __init__(self, capacity: int = 50_000):
+        """
+        Prepares an empty index.
+        :param capacity: Maximum amount of messages to remember. The oldest are forgotten first.
+        """
+        self.capacity = capacity
+
+        self.__message_ids = array.array("Q")
+        self.__channel_ids = array.array("Q")
+
+    def __len__(self) -> int:
+        return len(self.__message_ids)
+
+    def __contains__(self, message_id: int) -> bool:
+        return self.get(message_id) is not None
+
+    def add(self, message_id: int, channel_id: int) -> None:
+        """
+        Records a sent message.
+        :param message_id: ID of the sent message.
+        :param channel_id: ID of the channel it was sent in.
+        """
+        # Usual case: newest message goes on the end.
+        if not self.__message_ids or message_id > self.__message_ids[-1]:
+            self.__message_ids.append(message_id)
+            self.__channel_ids.append(channel_id)
+
+        # Out of order, or a repeat.
+        else:
+            position = bisect.bisect_left(self.__message_ids, message_id)
+            if position < len(self.__message_ids) and self.__message_ids[position] == message_id:
+                return
+
+            self.__message_ids.insert(position, message_id)
+            self.__channel_ids.insert(position, channel_id)
+
+        # Forget the oldest eighth at once, rather than shifting the arrays on every message.
+        if len(self.__message_ids) > self.capacity:
+            overflow = len(self.__message_ids) - self.capacity + self.capacity // 8
+            del self.__message_ids[:overflow]
+            del self.__channel_ids[:overflow]
+
+    def get(self, message_id: int) -> int | None:
+        """
+        Looks up a sent message.
+        :param message_id: ID of the message.
+        :return: The channel ID the message was sent in. None if the message isn't Hal's, or has been forgotten.
+        """
+        position = bisect.bisect_left(self.__message_ids, message_id)
+
+        if position < len(self.__message_ids) and self.__message_ids[position] == message_id:
+            return self.__channel_ids[position]
+
+    def forget_channels(self, channel_ids: set[int]) -> None:
+        """
+        Forgets every message sent in the given channels.
+        :param channel_ids: IDs of channels to forget.
+        """
+        keep = [i for i, channel_id in enumerate(self.__channel_ids) if channel_id not in channel_ids]
+
+        self.__message_ids = array.array("Q", (self.__message_ids[i] for i in keep))
+        self.__channel_ids = array.array("Q", (self.__channel_ids[i] for i in keep))
@@ -0,0 +1,59 @@
+"""
+    A cache of whether Hal can send messages in each channel, so channel scans don't resolve roles and overwrites from
+    scratch every time.
+"""
+import discord
+
+
+class PermissionCache:
+    """
+    Hal's own send permission, by channel ID. Invalidated by the bot on role, member, channel and guild updates.
+    """
+    def __init__(self):
+        self.__can_send: dict[int, bool] = {}
+        self.__guild_channels: dict[int, set[int]] = {}
+
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self.__can_send)
+
+    def can_send(self, channel: discord.TextChannel) -> bool:
+        """
+        Checks if Hal can send messages in a channel.
+        :param channel: The channel to check.
+        :return: True if allowed.
+        """
+        # Private channels aren't worth caching.
+        guild = getattr(channel, "guild", None)
+        if guild is None:
+            return channel.can_send(discord.Message)
+
+        try:
+            result = self.__can_send[channel.id]
+            self.hits += 1
+            return result
+
+        except KeyError:
+            self.misses += 1
+
+        result = self.__can_send[channel.id] = channel.can_send(discord.Message)
+        self.__guild_channels.setdefault(guild.id, set()).add(channel.id)
+
+        return result
+
+    def invalidate_channel(self, channel_id: int, guild_id: int) -> None:
+        """ Forgets a single channel. """
+        self.__can_send.pop(channel_id, None)
+        self.__guild_channels.get(guild_id, set()).discard(channel_id)
+
+    def invalidate_guild(self, guild_id: int) -> None:
+        """ Forgets every channel in a guild. """
+        for channel_id in self.__guild_channels.pop(guild_id, ()):
+            self.__can_send.pop(channel_id, None)
+
+    def clear(self) -> None:
+        """ Forgets everything. """
+        self.__can_send.clear()
+        self.__guild_channels.clear()
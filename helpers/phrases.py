@@ -0,0 +1,276 @@
+"""
+    Linear-time phrase matching. Python's `re` backtracks, so a crafted message can make a pattern like `\bs*s*s*x`
+    crawl. Patterns `re` can't backtrack badly on, which includes all of Hal's defaults, are left to `re`, since it's
+    the quickest on everyday messages. The rest are compiled into a small automaton that reads each character once.
+
+    Phrases containing `\b` are patterns, in a deliberately small language: literal characters (backslash escapes
+    punctuation), each optionally followed by `+`, `*` or `?`, and `\b` word boundaries. Matching is case-insensitive.
+    Anything else is rejected with a ValueError, rather than risk a slow pattern. Other phrases are plain substrings,
+    checked against the message with punctuation removed.
+"""
+from __future__ import annotations
+
+import functools
+import re
+import typing
+
+
+# Characters scanned per message. Discord allows up to 4000 for some users.
+SCAN_LIMIT = 2000
+
+# Cached automaton states per matcher, before the cache starts over. Transitions are capped at 16 per state.
+STATE_LIMIT = 2048
+
+BOUNDARY = None
+ONE, OPTIONAL, STAR = 0, 1, 2
+
+_QUANTIFIERS = {"+": None, "*": STAR, "?": OPTIONAL}
+
+
+def is_pattern(phrase: str) -> bool:
+    """ Phrases with a word boundary are patterns, the rest are plain text. """
+    return r"\b" in phrase
+
+
+def _is_word(char: str) -> bool:
+    return char.isalnum() or char == "_"
+
+
+def parse_pattern(pattern: str) -> list[tuple[str, int] | None]:
+    """
+    Parses a pattern into a list of items: `(character, ONE | OPTIONAL | STAR)`, or `BOUNDARY`.
+    :param pattern: The pattern, as written in `config.py`.
+    :return: The list of items.
+    """
+    items = []
+    i = 0
+
+    while i < len(pattern):
+        char = pattern[i]
+
+        if char == "\\":
+            if i + 1 >= len(pattern):
+                raise ValueError(f"Pattern {pattern!r} ends with a backslash.")
+
+            char = pattern[i + 1]
+            i += 2
+
+            if char == "b":
+                items.append(BOUNDARY)
+                continue
+            elif char.isalnum():
+                raise ValueError(f"Unsupported escape \\{char} in pattern {pattern!r}.")
+
+        elif char in "+*?":
+            raise ValueError(f"Nothing to repeat at position {i} in pattern {pattern!r}.")
+
+        elif char in ".^$|()[]{}":
+            raise ValueError(f"Unsupported character {char!r} in pattern {pattern!r}.")
+
+        else:
+            i += 1
+
+        char = char.lower()
+
+        # Quantifier, if any. "c+" is "c" then "c*".
+        quantifier = pattern[i] if i < len(pattern) else ""
+        if quantifier in _QUANTIFIERS:
+            i += 1
+            if quantifier == "+":
+                items += [(char, ONE), (char, STAR)]
+            else:
+                items.append((char, _QUANTIFIERS[quantifier]))
+        else:
+            items.append((char, ONE))
+
+    return items
+
+
+def is_backtrack_safe(items: list[tuple[str, int] | None]) -> bool:
+    """
+    Checks if `re` stays linear on a parsed pattern. It has to start at a word boundary, so only word edges are tried
+    as starts, and no repeated character may be one the following items could take instead, so giving characters back
+    always fails right away.
+    :param items: The pattern, from `parse_pattern`.
+    :return: True if it's safe to hand to `re`.
+    """
+    if not items or items[0] is not BOUNDARY:
+        return False
+
+    for i, item in enumerate(items):
+        if item is BOUNDARY or item[1] == ONE:
+            continue
+
+        for following in items[i + 1:]:
+            if following is BOUNDARY:
+                continue
+            if following[0] == item[0]:
+                return False
+            if following[1] == ONE:
+                break
+
+    return True
+
+
+def to_regex(items: list[tuple[str, int] | None]) -> re.Pattern:
+    """ Compiles a parsed pattern for `re`, to search lowercase text with. """
+    suffixes = {ONE: "", OPTIONAL: "?", STAR: "*"}
+    return re.compile("".join(r"\b" if item is BOUNDARY else re.escape(item[0]) + suffixes[item[1]] for item in items))
+
+
+class PhraseMatcher:
+    """
+    Matches a list of phrases against messages, returning the first phrase in list order that matches.
+    """
+    def __init__(self, phrases: typing.Iterable[str], backtracking: bool = True):
+        """
+        Compiles the phrases.
+        :param phrases: Plain phrases and patterns, in priority order.
+        :param backtracking: Hand patterns that are safe with `re` to it. False runs every pattern through the
+            automaton, which is slower on everyday messages but the same in the worst case.
+        """
+        self.phrases = tuple(phrases)
+
+        self.__plain = [(i, phrase) for i, phrase in enumerate(self.phrases) if not is_pattern(phrase)]
+
+        parsed = {i: parse_pattern(phrase) for i, phrase in enumerate(self.phrases) if is_pattern(phrase)}
+        safe = {i for i, items in parsed.items() if backtracking and is_backtrack_safe(items)}
+
+        self.__regexes = [(i, to_regex(items)) for i, items in parsed.items() if i in safe]
+        self.__patterns = {i: items for i, items in parsed.items() if i not in safe}
+
+        # The automaton's starting states: the beginning of every pattern.
+        self.__starts = frozenset((i, 0) for i in self.__patterns)
+
+        # Lazily built states. Each is a set of pattern positions, plus whether the last character was a word char.
+        self.__states: dict[tuple[frozenset, bool], int] = {}
+        self.__state_list: list[tuple[frozenset, bool]] = []
+        self.__transitions: dict[tuple[int, str], tuple[int, frozenset]] = {}
+
+    def __closure(self, positions: typing.Iterable[tuple[int, int]], boundary: bool) -> frozenset:
+        """ Follows every zero-width step from the given positions: optional items, and satisfied boundaries. """
+        seen = set()
+        stack = list(positions)
+
+        while stack:
+            position = stack.pop()
+            if position in seen:
+                continue
+            seen.add(position)
+
+            phrase, i = position
+            items = self.__patterns[phrase]
+            if i == len(items):
+                continue
+
+            item = items[i]
+            if (item is BOUNDARY and boundary) or (item is not BOUNDARY and item[1] != ONE):
+                stack.append((phrase, i + 1))
+
+        return frozenset(seen)
+
+    def __accepted(self, positions: frozenset) -> frozenset:
+        """ Patterns that have reached their end. """
+        return frozenset(p for p, i in positions if i == len(self.__patterns[p]))
+
+    def __state(self, positions: frozenset, word: bool) -> int:
+        """ Interns a state, returning its number. """
+        key = (positions, word)
+        number = self.__states.get(key)
+
+        if number is None:
+            number = self.__states[key] = len(self.__state_list)
+            self.__state_list.append(key)
+
+        return number
+
+    def __step(self, state: int, char: str) -> tuple[int, frozenset]:
+        """
+        Reads one character.
+        :return: The next state, and patterns that matched right before the character.
+        """
+        positions, was_word = self.__state_list[state]
+        is_word = _is_word(char)
+
+        closed = self.__closure(positions | self.__starts, was_word != is_word)
+
+        moved = set()
+        for phrase, i in closed:
+            items = self.__patterns[phrase]
+            if i < len(items) and items[i] is not BOUNDARY and items[i][0] == char:
+                moved.add((phrase, i if items[i][1] == STAR else i + 1))
+
+        return self.__state(frozenset(moved), is_word), self.__accepted(closed)
+
+    def __search_patterns(self, text: str, beat: int) -> int:
+        """
+        Runs the automaton over the text, stopping as soon as the best possible pattern is found.
+        :param text: Lowercase text.
+        :param beat: Only patterns listed before this index are of interest.
+        :return: Index of the earliest listed pattern that matched, or `beat` if none did better.
+        """
+        candidates = [i for i in self.__patterns if i < beat]
+        if not candidates:
+            return beat
+
+        best_possible = min(candidates)
+
+        # Start over if the cache has grown too big. Still linear, just slower until it warms up.
+        if len(self.__state_list) > STATE_LIMIT or len(self.__transitions) > 16 * STATE_LIMIT:
+            self.__states.clear()
+            self.__state_list.clear()
+            self.__transitions.clear()
+
+        state = self.__state(frozenset(), False)
+        transitions = self.__transitions
+
+        for char in text:
+            key = (state, char)
+            try:
+                state, accepted = transitions[key]
+            except KeyError:
+                state, accepted = transitions[key] = self.__step(state, char)
+
+            if accepted:
+                beat = min(beat, *accepted)
+                if beat == best_possible:
+                    return beat
+
+        # Anything that matches right at the end.
+        positions, was_word = self.__state_list[state]
+        accepted = self.__accepted(self.__closure(positions | self.__starts, was_word))
+        return min(beat, *accepted) if accepted else beat
+
+    def search(self, content: str, cleaned: str) -> str:
+        """
+        Finds the first listed phrase that matches.
+        :param content: Message content. Only the first `SCAN_LIMIT` characters are scanned for patterns.
+        :param cleaned: The same content put through `clean_string`, for plain phrases.
+        :return: The matching phrase. Empty string if none.
+        """
+        content = content[:SCAN_LIMIT].lower()
+
+        # Plain phrases, in order. Only the first one can matter.
+        best = len(self.phrases)
+        for i, phrase in self.__plain:
+            if phrase in cleaned:
+                best = i
+                break
+
+        # Then patterns listed before it, the first `re` one to match, then the automaton for what's left.
+        for i, regex in self.__regexes:
+            if i >= best:
+                break
+            if regex.search(content):
+                best = i
+                break
+
+        best = self.__search_patterns(content, best)
+
+        return self.phrases[best] if best < len(self.phrases) else ""
+
+
+@functools.lru_cache(maxsize=32)
+def phrase_matcher(phrases: tuple[str, ...]) -> PhraseMatcher:
+    """ A compiled matcher for the given phrases, shared between calls. """
+    return PhraseMatcher(phrases)
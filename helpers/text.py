@@ -1,8 +1,9 @@
-import re
 import typing
 
 import discord
 
+from .phrases import PhraseMatcher, phrase_matcher
+
 
 def clean_string(text: str) -> str:
     """
@@ -10,35 +11,28 @@ def clean_string(text: str) -> str:
     :param text: Input text.
     :return: Output text.
     """
-    new_text = ""
-    for i in text.lower():
-        # Save letters, numbers, and spaces.
-        if i.isalnum() or i.isspace():
-            new_text += i
-
-    return new_text
+    # Save letters, numbers, and spaces.
+    return "".join([i for i in text.lower() if i.isalnum() or i.isspace()])
 
 
-def check_match(matches: typing.Iterable[str], message: discord.Message, require: str = "hal") -> str:
+def check_match(matches: typing.Iterable[str] | PhraseMatcher, message: discord.Message, require: str = "hal") -> str:
     """
-    Checks for matches in a message. Flexible between regex and non-regex tests.
-    :param matches: List of matches as strings [words/regex].
+    Checks for matches in a message. Flexible between pattern and plain text tests, see `helpers.phrases`. Runs in
+    linear time, and only scans the start of very long messages for patterns.
+    :param matches: List of matches as strings [words/patterns], in priority order. Or an already compiled matcher.
     :param message: Discord message searching for a match.
     :param require: Additional string required to match. This is not included in the returned string.
         Default is "Hal".
     :return: Matched text. Empty string if none.
     """
-    original = clean_string(message.content.lower())
+    original = clean_string(message.content)
 
+    # Hal's name counts anywhere in the message.
     if require is not None and require not in original.split():
         return ""
 
-    # Check for keywords/regex, get level.
-    for query in matches:
-        if r"\b" in query and re.findall(query, message.content, re.I):
-            return query
-
-        elif query in original:
-            return query
+    # Check for keywords/patterns.
+    if not isinstance(matches, PhraseMatcher):
+        matches = phrase_matcher(tuple(matches))
 
-    return ""
+    return matches.search(message.content, original)
@@ -0,0 +1,141 @@
+"""
+    Token buckets for throttling commands, per user, channel and guild. A bucket left alone long enough to refill is
+    the same as no bucket, so those are dropped as they go idle.
+"""
+
+
+class TokenBuckets:
+    """
+    Buckets by ID, all with the same rate and size. Kept in order of last use, so idle ones are always at the front.
+    """
+    def __init__(self, amount: int, seconds: float):
+        """
+        :param amount: Bucket size, the burst allowed.
+        :param seconds: Seconds for an empty bucket to refill.
+        """
+        self.size = float(amount)
+        self.refill = seconds
+        self.rate = amount / seconds
+
+        self.__buckets: dict[int, tuple[float, float]] = {}
+
+    def __len__(self) -> int:
+        return len(self.__buckets)
+
+    def available(self, key: int, now: float) -> float:
+        """
+        :return: Tokens in a bucket right now.
+        """
+        bucket = self.__buckets.get(key)
+        if bucket is None:
+            return self.size
+
+        tokens, last = bucket
+        return min(self.size, tokens + (now - last) * self.rate)
+
+    def take(self, key: int, now: float) -> None:
+        """ Takes a token from a bucket, which should have one. """
+        tokens = self.available(key, now) - 1
+
+        # Re-inserting keeps the buckets in order of use.
+        self.__buckets.pop(key, None)
+        self.__buckets[key] = (tokens, now)
+
+        self.sweep(now)
+
+    def sweep(self, now: float) -> int:
+        """
+        Drops buckets that have refilled.
+        :return: Buckets dropped.
+        """
+        expired = []
+        for key, (_tokens, last) in self.__buckets.items():
+            if now - last < self.refill:
+                break
+            expired.append(key)
+
+        for key in expired:
+            del self.__buckets[key]
+
+        return len(expired)
+
+
+class CommandThrottle:
+    """
+    Per-command limits across users, channels and guilds. A command runs only if every one of its buckets has a token.
+    """
+    SCOPES = ("user", "channel", "guild")
+
+    def __init__(self, limits: dict[str, dict[str, tuple[int, float]]]):
+        """
+        :param limits: By command name, then scope, an (amount, per seconds) limit. "default" covers commands without
+            their own. Scopes left out aren't limited.
+        """
+        self.limits = limits
+
+        # Past the slowest refill, every bucket is full again, so a warning is as good as forgotten.
+        self.forget_after = max((seconds for scopes in limits.values() for _amount, seconds in scopes.values()),
+                                default=0)
+
+        self.__buckets: dict[tuple[str, str], TokenBuckets] = {}
+
+        # User ID -> when they were warned, oldest first.
+        self.__warned: dict[int, float] = {}
+
+    def __len__(self) -> int:
+        """ Buckets in use. """
+        return sum(len(buckets) for buckets in self.__buckets.values())
+
+    def __get(self, command: str, scope: str) -> TokenBuckets | None:
+        name = command if command in self.limits else "default"
+        buckets = self.__buckets.get((name, scope))
+
+        if buckets is None and (limit := self.limits.get(name, {}).get(scope)) is not None:
+            buckets = self.__buckets[(name, scope)] = TokenBuckets(*limit)
+
+        return buckets
+
+    def allow(self, command: str, user_id: int, channel_id: int, guild_id: int | None, now: float) -> bool:
+        """
+        Takes a token for a command invocation, if every bucket has one.
+        :param command: Qualified command name.
+        :param now: The current time.
+        :return: True if the command may run.
+        """
+        checks = []
+        for scope, key in zip(self.SCOPES, (user_id, channel_id, guild_id)):
+            if key is None or (buckets := self.__get(command, scope)) is None:
+                continue
+            if buckets.available(key, now) < 1:
+                return False
+            checks.append((buckets, key))
+
+        for buckets, key in checks:
+            buckets.take(key, now)
+
+        self.__warned.pop(user_id, None)
+        return True
+
+    def warn(self, user_id: int, now: float) -> bool:
+        """
+        :param now: The current time.
+        :return: True the first time a user is throttled, until they're let through again, or long enough passes.
+        """
+        self.__forget_warnings(now)
+
+        if user_id in self.__warned:
+            return False
+
+        self.__warned[user_id] = now
+        return True
+
+    def __forget_warnings(self, now: float) -> None:
+        """ Drops warnings old enough that the user's buckets have refilled. """
+        expired = []
+        for user_id, warned in self.__warned.items():
+            if now - warned < self.forget_after:
+                break
+            expired.append(user_id)
+
+        for user_id in expired:
+            del self.__warned[user_id]
@@ -1,3 +1,6 @@
+import itertools
+import typing
+
 import discord
 from discord.ext import commands
 
@@ -85,15 +88,104 @@ class PhrasesEmbed(discord.Embed):
     """
     A more complex embed for debug/dev messages to be sent in Discord.
     """
-    def __init__(self):
+    blank_message = "None."
+
+    def __init__(self, quiet_phrases: typing.Iterable[str] = None, return_phrases: typing.Iterable[str] = None,
+                 quiet_emoji: str = None):
         """
-        Builds an info embed with the given fields of information.
+        Builds an info embed with the given silencing configuration. Defaults to `config.py`.
         """
-        super().__init__(type="rich", color=COLOR, description=f"Silencing emoji: {config.QUIET_EMOJI}")
+        quiet_phrases = config.quiet_phrases if quiet_phrases is None else quiet_phrases
+        return_phrases = config.return_phrases if return_phrases is None else return_phrases
+
+        super().__init__(type="rich", color=COLOR, description=f"Silencing emoji: {quiet_emoji or config.QUIET_EMOJI}")
 
         for label, phrases in [
-            ("Silencing phrases", config.quiet_phrases),
-            ("Returning phrases", config.return_phrases)
+            ("Silencing phrases", quiet_phrases),
+            ("Returning phrases", return_phrases)
         ]:
-            value = "\n".join(phrases)
+            value = "\n".join(phrases) or self.blank_message
             self.add_field(name=label + ":", value=value, inline=True)
+
+
+class PagedView(discord.ui.View):
+    """
+    A listing, a page at a time, with buttons to flip through. Lines are pulled from the iterable only as pages are
+    shown, so long listings cost only what's looked at.
+    """
+    blank_message = "Nothing here."
+
+    def __init__(self, title: str, lines: typing.Iterable[str], per_page: int = 15, owner_id: int = None,
+                 timeout: float = 180):
+        """
+        Builds the view, rendering the first page.
+        :param title: Title on every page.
+        :param lines: Lines to list. Taken lazily, so iterate over a copy of anything that might change meanwhile.
+        :param per_page: Lines per page.
+        :param owner_id: The only user allowed to flip pages. Anyone if None.
+        :param timeout: Seconds of inactivity before the buttons stop working.
+        """
+        super().__init__(timeout=timeout)
+
+        self.title = title
+        self.per_page = per_page
+        self.owner_id = owner_id
+        self.page = 0
+
+        self.__lines = iter(lines)
+        self.__upcoming = next(self.__lines, None)
+        self.__pages: list[list[str]] = []
+
+        self.__render(0)
+        self.__update_buttons()
+
+    def __render(self, page: int) -> None:
+        """ Pulls lines until the given page exists, or the lines run out. """
+        while len(self.__pages) <= page and self.__upcoming is not None:
+            lines = [self.__upcoming, *itertools.islice(self.__lines, self.per_page - 1)]
+            self.__upcoming = next(self.__lines, None)
+
+            # Embed descriptions max out at 4096 characters.
+            self.__pages.append([line[:4096 // self.per_page - 1] for line in lines])
+
+    @property
+    def has_next(self) -> bool:
+        return self.page + 1 < len(self.__pages) or self.__upcoming is not None
+
+    def embed(self) -> discord.Embed:
+        """
+        :return: The current page.
+        """
+        lines = self.__pages[self.page] if self.__pages else [self.blank_message]
+
+        embed = discord.Embed(type="rich", color=COLOR, title=self.title, description="\n".join(lines))
+        embed.set_footer(text=f"Page {self.page + 1}" + ("" if self.has_next else f" of {max(len(self.__pages), 1)}"))
+
+        return embed
+
+    def __update_buttons(self) -> None:
+        self.previous_page.disabled = self.page == 0
+        self.next_page.disabled = not self.has_next
+
+    async def __flip(self, interaction: discord.Interaction, step: int) -> None:
+        self.page += step
+        self.__render(self.page)
+        self.__update_buttons()
+
+        await interaction.response.edit_message(embed=self.embed(), view=self)
+
+    async def interaction_check(self, interaction: discord.Interaction) -> bool:
+        return self.owner_id is None or interaction.user.id == self.owner_id
+
+    async def on_timeout(self) -> None:
+        self.disable_all_items()
+        if self.message is not None:
+            await self.message.edit(view=self)
+
+    @discord.ui.button(emoji="◀", style=discord.ButtonStyle.secondary)
+    async def previous_page(self, _button: discord.ui.Button, interaction: discord.Interaction):
+        await self.__flip(interaction, -1)
+
+    @discord.ui.button(emoji="▶", style=discord.ButtonStyle.secondary)
+    async def next_page(self, _button: discord.ui.Button, interaction: discord.Interaction):
+        await self.__flip(interaction, 1)
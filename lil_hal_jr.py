@@ -1,20 +1,95 @@
+import asyncio
+import contextvars
 import os
+import signal
 
 from dotenv import load_dotenv
 load_dotenv()
 
 import cogs
-from bot import LilHalJr
+import config
+from bot import LilHalJr, Persona, runtime
 
 
-# Initialize.
-lil_hal = LilHalJr()
+def build(persona: Persona) -> LilHalJr:
+    """
+    Builds a client, and loads its cogs. Run in a context of its own, so anything the client or its cogs start knows
+    which client it belongs to.
+    :param persona: Who the client is.
+    :return: The client, not yet started.
+    """
+    client = LilHalJr(persona)
 
-# Load implemented cogs.
-for i in cogs.implemented:
-    lil_hal.load_extension(f"cogs.{i}")
+    for i in persona.cogs or cogs.implemented:
+        client.load_extension(f"cogs.{i}")
+
+    return client
+
+
+# Runtime profile first, clients take their loop when built.
+runtime.apply(config.USE_UVLOOP, config.USE_ORJSON)
+
+# Initialize. Everything imported is shared, each client keeps its own state.
+clients = [contextvars.copy_context().run(build, Persona(**persona)) for persona in config.PERSONAS]
+lil_hal = clients[0]
+
+# One loop, one watchdog.
+for client in clients[1:]:
+    client.watchdog = lil_hal.watchdog
+
+
+async def run(client: LilHalJr) -> None:
+    """ Runs one client, with its health checks and event recorder alongside. """
+    await client.health.start()
+    if client.recorder is not None:
+        client.recorder.start()
+
+    try:
+        await client.start(os.getenv(client.persona.token_variable))
+    finally:
+        await client.health.stop()
+        await client.flush_analytics()
+        if client.recorder is not None:
+            client.recorder.stop()
+
+        if not client.is_closed():
+            await client.close()
+
+
+async def main() -> None:
+    """ Runs every client, and the stall watchdog. """
+    lil_hal.watchdog.start()
+
+    try:
+        await asyncio.gather(*(run(client) for client in clients))
+    finally:
+        lil_hal.watchdog.stop()
 
 
 if __name__ == "__main__":
-    # Run.
-    lil_hal.run(os.getenv("DISCORD_TOKEN"))
+    # Run, on the loop the clients were built with.
+    loop = lil_hal.loop
+    task = loop.create_task(main())
+
+    # Ctrl+C or a supervisor's SIGTERM cancels everything, so each client still cleans up after itself.
+    for signal_number in (signal.SIGINT, signal.SIGTERM):
+        try:
+            loop.add_signal_handler(signal_number, task.cancel)
+        except NotImplementedError:
+            pass  # Windows. Ctrl+C arrives as KeyboardInterrupt instead.
+
+    try:
+        loop.run_until_complete(task)
+    except KeyboardInterrupt:
+        task.cancel()
+    except asyncio.CancelledError:
+        pass
+    finally:
+        # Whatever's left, like task loops, goes too. Including main, if it was interrupted rather than cancelled.
+        pending = asyncio.all_tasks(loop)
+        for leftover in pending:
+            leftover.cancel()
+        loop.run_until_complete(asyncio.gather(*pending, return_exceptions=True))
+
+        loop.run_until_complete(loop.shutdown_asyncgens())
+        loop.close()
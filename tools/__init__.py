@@ -0,0 +1,3 @@
+"""
+    Offline tooling for Lil Hal Jr.: simulation, measurement, and the fake Discord objects they share.
+"""
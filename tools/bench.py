@@ -0,0 +1,226 @@
+"""
+    Micro-benchmarks for the helpers and the message path, run offline against fake Discord objects. Results can be
+    saved as a JSON baseline, and later runs compared against it, failing on regressions. Runs compare against the
+    committed tools/bench_baseline.json unless told otherwise. Timings are machine-specific, so re-save it on the
+    machine that runs the comparisons, and commit it with changes that are meant to be slower.
+
+    python -m tools.bench
+    python -m tools.bench --save tools/bench_baseline.json
+    python -m tools.bench --compare other_baseline.json --threshold 0.15
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import sys
+import time
+import typing
+
+import config
+import helpers
+from bot import common
+
+from .fakes import FakeMessage
+from .simulate import virtual_world
+
+BASELINE = os.path.join(os.path.dirname(__file__), "bench_baseline.json")
+
+Benchmark = typing.Callable[[], object]
+
+CHATTER = "honestly i think the game was really cool today but hal was weird about it"
+SHUSH = "hal shhh please, be quiet"
+ADVERSARIAL = "s" * 1000 + "h" * 999 + "x"
+
+
+def measure(function: Benchmark, budget: float = 0.2, repeats: int = 5) -> float:
+    """
+    Times a function.
+    :param function: What to run, with no arguments.
+    :param budget: Rough seconds to spend per repeat.
+    :param repeats: Repeats to take the best of.
+    :return: Best time per call, in nanoseconds.
+    """
+    # Calibrate the amount of calls per repeat.
+    calls = 1
+    while True:
+        started = time.perf_counter()
+        for _ in range(calls):
+            function()
+        elapsed = time.perf_counter() - started
+
+        if elapsed >= budget / 10 or calls >= 1 << 24:
+            break
+        calls *= 4
+
+    calls = max(1, int(calls * budget / max(elapsed, 1e-9)))
+
+    best = float("inf")
+    for _ in range(repeats):
+        started = time.perf_counter()
+        for _ in range(calls):
+            function()
+        best = min(best, (time.perf_counter() - started) / calls)
+
+    return best * 1e9
+
+
+def helper_benchmarks(world) -> dict[str, Benchmark]:
+    """ Benchmarks for `helpers`. """
+    channel = world.guilds[0].text_channels[1]
+    human = next(m for m in world.guilds[0].members.values() if not m.bot)
+
+    chatter = FakeMessage(channel, human, CHATTER)
+    shush = FakeMessage(channel, human, SHUSH)
+    adversarial = FakeMessage(channel, human, "hal " + ADVERSARIAL)
+    question = FakeMessage(channel, human, "^inquire is hal going to answer this question")
+
+    command = world.bot.get_command("inquire")
+    cog = world.bot.get_cog("Social")
+
+    return {
+        "clean_string": lambda: helpers.clean_string(CHATTER),
+        "check_match chatter": lambda: helpers.check_match(config.quiet_phrases.keys(), chatter),
+        "check_match shush": lambda: helpers.check_match(config.quiet_phrases.keys(), shush),
+        "check_match adversarial": lambda: helpers.check_match(config.quiet_phrases.keys(), adversarial),
+        "random_number": helpers.random_number,
+        "random_number percentage": lambda: helpers.random_number(percentage=True),
+        "inquire_answer": lambda: helpers.inquire_answer(question),
+        "Scrabble.single_draw": helpers.Scrabble.single_draw,
+        "HelpCommandEmbed": lambda: helpers.HelpCommandEmbed(command),
+        "HelpCogEmbed": lambda: helpers.HelpCogEmbed(cog),
+        "PhrasesEmbed": helpers.PhrasesEmbed,
+    }
+
+
+def message_benchmarks(loop, world) -> dict[str, Benchmark]:
+    """ Benchmarks for `LilHalJr.on_message`, through to `update_apprehension`. """
+    bot = world.bot
+    quiet, busy = world.guilds[0].text_channels[3], world.guilds[0].text_channels[4]
+    human = next(m for m in world.guilds[0].members.values() if not m.bot)
+
+    # Short messages skip the waiting loop, so only the message path itself is timed.
+    short = FakeMessage(busy, human, "lol same")
+    shush = FakeMessage(quiet, human, SHUSH)
+    for message in (short, shush):
+        message.channel.messages.append(message)
+
+    def on_message(message: FakeMessage) -> Benchmark:
+        def run() -> None:
+            loop.run_until_complete(bot.on_message(message))
+            bot.muted_channels.clear()
+            bot.muted_scopes.clear()
+
+        return run
+
+    return {
+        "on_message short": on_message(short),
+        "on_message shush": on_message(shush),
+        "update_apprehension shush": lambda: (bot.update_apprehension(shush), bot.muted_channels.clear()),
+    }
+
+
+def run(names: typing.Iterable[str] = None, budget: float = 0.2) -> tuple[dict[str, float], list[str]]:
+    """
+    Runs the benchmarks.
+    :param names: Substrings of benchmark names to run. All if None.
+    :param budget: Rough seconds per repeat.
+    :return: Nanoseconds per call, by benchmark name, and the names of benchmarks that raised.
+    """
+    results = {}
+    failed = []
+
+    with virtual_world() as (loop, world):
+        # Reactions from the message path would pile up as tasks, let them go nowhere.
+        common.emoji_confirmation, original = (lambda *_args, **_kwargs: None), common.emoji_confirmation
+
+        try:
+            benchmarks = helper_benchmarks(world) | message_benchmarks(loop, world)
+
+            for name, function in benchmarks.items():
+                if names and not any(n.lower() in name.lower() for n in names):
+                    continue
+
+                # Errors in handlers Hal dispatches to are counted by the world, rather than raised here.
+                random.seed(0)
+                errors = world.stats["errors"]
+                try:
+                    results[name] = measure(function, budget)
+                except Exception as error:
+                    world.report(name, error)
+
+                if world.stats["errors"] > errors:
+                    results.pop(name, None)
+                    failed.append(name)
+                    print(f"  {name:<32} {'FAILED':>12}")
+                else:
+                    print(f"  {name:<32} {results[name]:>12.0f} ns")
+
+        finally:
+            common.emoji_confirmation = original
+
+    return results, failed
+
+
+def compare(results: dict[str, float], baseline: dict[str, float], threshold: float) -> list[str]:
+    """
+    Compares results with a baseline.
+    :param threshold: Allowed slowdown, as a fraction. 0.15 is 15% slower.
+    :return: Names of regressed benchmarks.
+    """
+    regressed = []
+
+    print(f"{'benchmark':<34} {'baseline':>12} {'now':>12} {'change':>8}")
+    for name, now in results.items():
+        before = baseline.get(name)
+        if before is None:
+            print(f"  {name:<32} {'-':>12} {now:>12.0f}      new")
+            continue
+
+        change = now / before - 1
+        flag = ""
+        if change > threshold:
+            regressed.append(name)
+            flag = "  REGRESSED"
+
+        print(f"  {name:<32} {before:>12.0f} {now:>12.0f} {change:>+8.1%}{flag}")
+
+    return regressed
+
+
+def main(argv: list[str] = None) -> None:
+    parser = argparse.ArgumentParser(description="Benchmark Lil Hal Jr.'s helpers and message path.")
+    parser.add_argument("names", nargs="*", help="Only run benchmarks with these in their names.")
+    parser.add_argument("--budget", type=float, default=0.2, help="Rough seconds per repeat.")
+    parser.add_argument("--save", metavar="PATH", help="Save results as a JSON baseline.")
+    parser.add_argument("--compare", metavar="PATH",
+                        help="Compare with a JSON baseline. The committed one by default, unless saving.")
+    parser.add_argument("--threshold", type=float, default=0.15, help="Allowed slowdown when comparing.")
+    args = parser.parse_args(argv)
+
+    if args.compare is None and not args.save:
+        args.compare = BASELINE
+
+    print(f"Python {platform.python_version()} on {platform.machine()}.")
+    results, failed = run(args.names, args.budget)
+
+    if failed:
+        print(f"{len(failed)} raised: {', '.join(failed)}.")
+        sys.exit(1)
+
+    if args.save:
+        with open(args.save, "w", encoding="utf-8") as file:
+            json.dump({"python": platform.python_version(), "results": results}, file, indent=2)
+        print(f"Saved baseline to {args.save}.")
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as file:
+            baseline = json.load(file)["results"]
+
+        if regressed := compare(results, baseline, args.threshold):
+            print(f"{len(regressed)} regressed past {args.threshold:.0%}: {', '.join(regressed)}.")
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,236 @@
+"""
+    Streams an export of messages through Hal's matching code, to see what the configured phrases would catch on real
+    traffic. Work is spread over a process pool in chunks, with a bounded amount of chunks in flight, so memory stays
+    flat no matter how big the corpus is.
+
+    python -m tools.corpus messages.jsonl.gz --workers 8 --samples 5
+
+    Each line is a JSON object with a "content" string. An optional "mentions" list of user IDs is checked against
+    `--hal-id` for pings. Lines that aren't JSON objects are taken as plain content.
+"""
+import argparse
+import collections
+import concurrent.futures
+import gzip
+import itertools
+import json
+import os
+import random
+import sys
+import time
+import types
+import typing
+
+import config
+import helpers
+from bot import LilHalJr, Persona
+
+# Corpora are checked against Hal's name.
+HAL = Persona()
+
+
+class Report:
+    """
+    Counts, and a bounded reservoir of sample matches per phrase.
+    """
+    def __init__(self, samples: int = 5, seed: int = 0):
+        self.samples = samples
+        self.rng = random.Random(seed)
+
+        self.counts = collections.Counter()
+        self.matches = collections.Counter()
+        self.examples: dict[str, list[str]] = collections.defaultdict(list)
+        self.__seen = collections.Counter()
+
+    def sample(self, key: str, content: str) -> None:
+        """ Reservoir-samples an example for the given key. """
+        self.__seen[key] += 1
+        examples = self.examples[key]
+
+        if len(examples) < self.samples:
+            examples.append(content)
+        elif (i := self.rng.randrange(self.__seen[key])) < self.samples:
+            examples[i] = content
+
+    def merge(self, other: "Report") -> None:
+        """
+        Folds another report into this one. Each reservoir stands for every message its report saw, so examples are
+        drawn from both in proportion to those counts, as if it had all been one stream.
+        """
+        self.counts += other.counts
+        self.matches += other.matches
+
+        for key, theirs in other.examples.items():
+            ours = self.examples[key]
+            ours_left, theirs_left = self.__seen[key], other.__seen[key]
+
+            # Reservoirs keep some arrival order, so shuffle before drawing from the end.
+            ours, theirs = self.rng.sample(ours, len(ours)), self.rng.sample(theirs, len(theirs))
+
+            merged = []
+            while len(merged) < self.samples and (ours or theirs):
+                if self.rng.randrange(ours_left + theirs_left) < ours_left:
+                    merged.append(ours.pop())
+                    ours_left -= 1
+                else:
+                    merged.append(theirs.pop())
+                    theirs_left -= 1
+
+            self.examples[key] = merged
+            self.__seen[key] += other.__seen[key]
+
+
+def parse(line: bytes) -> tuple[str, list[int]]:
+    """
+    Reads one line of the export.
+    :return: Message content, and mentioned user IDs.
+    """
+    try:
+        record = json.loads(line)
+    except ValueError:
+        return line.decode("utf-8", "replace").rstrip("\n"), []
+
+    if isinstance(record, dict):
+        return str(record.get("content", "")), record.get("mentions") or []
+
+    return str(record), []
+
+
+def scan(lines: list[bytes], hal_id: int = None, samples: int = 5) -> Report:
+    """
+    Runs a chunk of lines through the same checks Hal uses. Runs in a worker process.
+    :param lines: Raw lines of the export.
+    :param hal_id: Hal's user ID, for counting pings.
+    :param samples: Examples to keep per phrase.
+    :return: The chunk's report.
+    """
+    report = Report(samples)
+    phrases = list(config.quiet_phrases) + config.return_phrases
+
+    for line in lines:
+        content, mentions = parse(line)
+        message = types.SimpleNamespace(content=content)
+        report.counts["messages"] += 1
+
+        # Would Hal consider responding at all?
+        pinged = hal_id is not None and hal_id in mentions
+        if pinged or HAL.is_named(content):
+            report.counts["referenced"] += 1
+        if LilHalJr.is_chatter(content):
+            report.counts["long enough to answer"] += 1
+
+        # Which phrase wins, as Hal would see it.
+        if quiet := helpers.check_match(config.quiet_phrases.keys(), message):
+            report.counts["would mute"] += 1
+            report.counts[f"would mute: {quiet}"] += 1
+        if helpers.check_match(config.return_phrases, message):
+            report.counts["would unmute"] += 1
+
+        # Every phrase on its own, with and without Hal's name.
+        for phrase in phrases:
+            if helpers.check_match([phrase], message):
+                report.matches[phrase] += 1
+                report.sample(phrase, content)
+
+            elif helpers.check_match([phrase], message, require=None):
+                report.matches[f"{phrase} (no name)"] += 1
+                report.sample(f"{phrase} (no name)", content)
+
+        # Bad word filter, which is substring based.
+        if not helpers.is_safe_letters([content]):
+            report.counts["bad word filter"] += 1
+            report.sample("bad word filter", content)
+
+    return report
+
+
+def read_lines(path: str) -> typing.Iterator[bytes]:
+    """ Lazily reads a plain or gzipped file, or standard input for "-". """
+    if path == "-":
+        yield from sys.stdin.buffer
+        return
+
+    opener = gzip.open if path.endswith(".gz") else open
+    with opener(path, "rb") as file:
+        yield from file
+
+
+def chunked(lines: typing.Iterable[bytes], size: int) -> typing.Iterator[list[bytes]]:
+    """ Groups lines into lists of the given size. """
+    iterator = iter(lines)
+    while chunk := list(itertools.islice(iterator, size)):
+        yield chunk
+
+
+def run(path: str, workers: int = None, chunk_size: int = 5000, hal_id: int = None, samples: int = 5) -> Report:
+    """
+    Scans a whole corpus.
+    :param path: File to read.
+    :param workers: Process pool size. Defaults to the CPU count.
+    :param chunk_size: Lines per task.
+    :param hal_id: Hal's user ID, for counting pings.
+    :param samples: Examples to keep per phrase.
+    :return: The combined report.
+    """
+    total = Report(samples)
+    workers = workers or os.cpu_count() or 1
+
+    with concurrent.futures.ProcessPoolExecutor(workers) as pool:
+        # Only a couple of chunks per worker are ever waiting, which keeps memory constant.
+        limit = 2 * workers
+        pending = set()
+
+        for chunk in chunked(read_lines(path), chunk_size):
+            pending.add(pool.submit(scan, chunk, hal_id, samples))
+
+            if len(pending) >= limit:
+                done, pending = concurrent.futures.wait(pending, return_when=concurrent.futures.FIRST_COMPLETED)
+                for future in done:
+                    total.merge(future.result())
+
+        for future in concurrent.futures.as_completed(pending):
+            total.merge(future.result())
+
+    return total
+
+
+def main(argv: list[str] = None) -> None:
+    parser = argparse.ArgumentParser(description="Run a message export through Lil Hal Jr.'s phrase matching.")
+    parser.add_argument("path", help="JSONL file, optionally gzipped. \"-\" reads standard input.")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes. Defaults to the CPU count.")
+    parser.add_argument("--chunk-size", type=int, default=5000, help="Lines per chunk of work.")
+    parser.add_argument("--hal-id", type=int, default=None, help="Hal's user ID, to count pings.")
+    parser.add_argument("--samples", type=int, default=5, help="Example matches kept per phrase.")
+    parser.add_argument("--json", action="store_true", help="Print the report as JSON.")
+    args = parser.parse_args(argv)
+
+    started = time.perf_counter()
+    report = run(args.path, args.workers, args.chunk_size, args.hal_id, args.samples)
+    elapsed = time.perf_counter() - started
+
+    rate = report.counts["messages"] / elapsed if elapsed else 0
+
+    if args.json:
+        json.dump({"seconds": elapsed, "messages_per_second": rate, "counts": report.counts,
+                   "matches": report.matches, "examples": report.examples}, sys.stdout, indent=2)
+        print()
+        return
+
+    print(f"{report.counts['messages']} messages in {elapsed:.2f} seconds ({rate:.0f}/s).")
+    for key, value in sorted(report.counts.items()):
+        print(f"  {key}: {value}")
+
+    print("Matches per phrase:")
+    for phrase, value in report.matches.most_common():
+        print(f"  {phrase!r}: {value}")
+        for example in report.examples[phrase]:
+            print(f"      {example[:120]!r}")
+
+    if examples := report.examples.get("bad word filter"):
+        print("Bad word filter samples:")
+        for example in examples:
+            print(f"      {example[:120]!r}")
+
+
+if __name__ == "__main__":
+    main()
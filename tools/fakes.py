@@ -0,0 +1,149 @@
+"""
+    Stand-ins for the handful of Discord objects Hal actually touches, so he can be driven offline. Only the attributes
+    and methods used by `bot`, `cogs` and `helpers` are implemented.
+"""
+from __future__ import annotations
+
+import itertools
+import typing
+
+import discord
+
+from bot import common
+
+
+_sequence = itertools.count()
+
+
+def snowflake() -> int:
+    """ A unique, time-ordered ID at the current clock time. """
+    return discord.utils.time_snowflake(common.clock.now()) + (next(_sequence) & 0x3FFFFF)
+
+
+class FakeUser:
+    """
+    A user or member.
+    """
+    def __init__(self, name: str, user_id: int = None, bot: bool = False, guild: FakeGuild = None):
+        self.id = user_id or snowflake()
+        self.name = name
+        self.display_name = name
+        self.bot = bot
+        self.guild = guild
+        self.status = discord.Status.online
+
+    def __str__(self) -> str:
+        return self.name
+
+    @property
+    def mention(self) -> str:
+        return f"<@{self.id}>"
+
+    def mentioned_in(self, message: FakeMessage) -> bool:
+        return self in message.mentions
+
+
+class FakeMessage:
+    """
+    A message. Reactions are collected rather than sent anywhere.
+    """
+    def __init__(self, channel: FakeChannel, author: FakeUser, content: str, mentions: list[FakeUser] = None):
+        self.id = snowflake()
+        self.channel = channel
+        self.guild = channel.guild
+        self.author = author
+        self.content = content
+        self.mentions = mentions or []
+        self.reactions = []
+        self.created_at = common.clock.now()
+
+        # The bot's connection state, which command contexts are built from.
+        self._state = channel.guild.world.bot._connection
+
+    async def add_reaction(self, emoji: str) -> None:
+        self.reactions.append(emoji)
+        self.channel.guild.world.on_reaction(self, emoji)
+
+
+class FakeChannel:
+    """
+    A text channel, which hands everything sent in it to its world.
+    """
+    def __init__(self, guild: FakeGuild, name: str, category_id: int = None, writable: bool = True):
+        self.id = snowflake()
+        self.guild = guild
+        self.name = name
+        self.category_id = category_id
+        self.writable = writable
+        self.position = len(guild.text_channels)
+
+        self.messages: list[FakeMessage] = []
+
+    def __str__(self) -> str:
+        return self.name
+
+    @property
+    def mention(self) -> str:
+        return f"<#{self.id}>"
+
+    @property
+    def last_message(self) -> FakeMessage | None:
+        return self.messages[-1] if self.messages else None
+
+    def can_send(self, *_objects) -> bool:
+        return self.writable
+
+    async def trigger_typing(self) -> None:
+        self.guild.world.on_typing(self, self.guild.world.hal)
+
+    async def send(self, content: str = None, **kwargs) -> FakeMessage:
+        message = FakeMessage(self, self.guild.world.hal, content or "")
+        self.guild.world.on_message(message, **kwargs)
+        return message
+
+    async def history(self, limit: int = 100) -> typing.AsyncIterator[FakeMessage]:
+        for message in reversed(self.messages[-limit:]):
+            yield message
+
+
+class FakeGuild:
+    """
+    A guild, belonging to a simulated world.
+    """
+    def __init__(self, world, name: str, guild_id: int = None):
+        self.world = world
+        self.id = guild_id or snowflake()
+        self.name = name
+
+        self.text_channels: list[FakeChannel] = []
+        self.members: dict[int, FakeUser] = {}
+
+    def __str__(self) -> str:
+        return self.name
+
+    @property
+    def channels(self) -> list[FakeChannel]:
+        return self.text_channels
+
+    @property
+    def me(self) -> FakeUser:
+        return self.world.hal
+
+    def add_channel(self, name: str, **kwargs) -> FakeChannel:
+        channel = FakeChannel(self, name, **kwargs)
+        self.text_channels.append(channel)
+        return channel
+
+    def add_member(self, member: FakeUser) -> FakeUser:
+        self.members[member.id] = member
+        return member
+
+    def get_member(self, user_id: int) -> FakeUser | None:
+        return self.members.get(user_id)
+
+    def get_channel(self, channel_id: int) -> FakeChannel | None:
+        for channel in self.text_channels:
+            if channel.id == channel_id:
+                return channel
+
+    _resolve_channel = get_channel
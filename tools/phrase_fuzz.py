@@ -0,0 +1,98 @@
+"""
+    Fuzzes `helpers.phrases` against Python's `re`, then times adversarial messages to check that the worst case stays
+    bounded. Exits non-zero on any mismatch, or if the worst case goes over budget.
+
+    python -m tools.phrase_fuzz --rounds 20000 --budget-ms 5
+"""
+import argparse
+import random
+import re
+import sys
+import time
+
+import config
+from helpers.phrases import SCAN_LIMIT, PhraseMatcher, is_pattern
+
+
+ALPHABET = "shuSHU a!_xyb"
+
+# Messages built to make backtracking matchers suffer.
+ADVERSARIAL = {
+    "s then h runs": lambda n: "s" * (n // 2) + "h" * (n // 2 - 1) + "x",
+    "alternating sh": lambda n: "sh" * (n // 2),
+    "spaced s": lambda n: "s " * (n // 2),
+    "repeated shush": lambda n: ("shus" * n)[:n],
+    "s run, no end": lambda n: "s" * n,
+    "over the limit": lambda n: "s" * (n * 4),
+}
+
+
+def fuzz(patterns: list[str], rounds: int, rng: random.Random) -> int:
+    """
+    Compares each pattern with `re` on random short strings.
+    :return: The amount of mismatches.
+    """
+    mismatches = 0
+
+    for pattern in patterns:
+        # Both ways a pattern can be matched: handed to `re` where safe, and always through the automaton.
+        matchers = (PhraseMatcher([pattern]), PhraseMatcher([pattern], backtracking=False))
+
+        for _ in range(rounds):
+            text = "".join(rng.choice(ALPHABET) for _ in range(rng.randint(0, 16)))
+            expected = bool(re.search(pattern, text, re.I))
+
+            for matcher in matchers:
+                if bool(matcher.search(text, "")) != expected:
+                    mismatches += 1
+                    print(f"Mismatch: {pattern!r} on {text!r}")
+
+    return mismatches
+
+
+def worst_case(phrases: list[str], repeats: int = 20) -> dict[str, float]:
+    """
+    Times adversarial messages against the full phrase list.
+    :return: Slowest time in milliseconds, per kind of message.
+    """
+    matcher = PhraseMatcher(phrases)
+    results = {}
+
+    for name, build in ADVERSARIAL.items():
+        text = build(SCAN_LIMIT)
+        slowest = 0.0
+
+        for _ in range(repeats):
+            started = time.perf_counter()
+            matcher.search(text, text)
+            slowest = max(slowest, time.perf_counter() - started)
+
+        results[name] = slowest * 1000
+
+    return results
+
+
+def main(argv: list[str] = None) -> None:
+    parser = argparse.ArgumentParser(description="Fuzz and time Lil Hal Jr.'s phrase matcher.")
+    parser.add_argument("--rounds", type=int, default=20000, help="Random strings per pattern.")
+    parser.add_argument("--seed", type=int, default=0, help="Random seed.")
+    parser.add_argument("--budget-ms", type=float, default=5, help="Worst-case time allowed per message.")
+    args = parser.parse_args(argv)
+
+    # The extra patterns aren't safe with `re`, like a server's own could be, so the automaton gets timed too.
+    extra = [r"\bh?a\b", r"\bs*s\b", r"\ba+b?a\b", r"\bs*s*s*h"]
+    patterns = [p for p in config.quiet_phrases if is_pattern(p)] + extra
+    mismatches = fuzz(patterns, args.rounds, random.Random(args.seed))
+    print(f"{mismatches} mismatches in {2 * args.rounds * len(patterns)} fuzzed strings.")
+
+    over = False
+    for name, milliseconds in worst_case(list(config.quiet_phrases) + config.return_phrases + extra).items():
+        flag = "" if milliseconds <= args.budget_ms else "  OVER BUDGET"
+        over = over or bool(flag)
+        print(f"  {name}: {milliseconds:.3f} ms{flag}")
+
+    sys.exit(1 if mismatches or over else 0)
+
+
+if __name__ == "__main__":
+    main()
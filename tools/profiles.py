@@ -0,0 +1,229 @@
+"""
+    Compares runtime profiles (see bot/runtime.py) on replayed gateway traffic: every combination of event loop, JSON
+    codec and compression that's installed. Traffic is a synthetic mix by default, or replayed from event recordings.
+
+    Limitation: this is a stand-in for py-cord's receive path, not that path. Each event is inflated, decoded and handed
+    to a task in a loop written here, while DiscordWebSocket.received_message also logs, tracks sequence numbers and
+    heartbeats, and runs a parser that builds models and updates the cache. Those costs are the same under every
+    profile and left out here, so the differences shown are larger, relative to a real gateway, than Hal would see.
+
+    python -m tools.profiles --events 200000
+    python -m tools.profiles --recording recordings/events-*.jsonl.gz
+"""
+import argparse
+import asyncio
+import itertools
+import json
+import platform
+import random
+import time
+import typing
+import zlib
+
+from bot.recorder import read_recording
+
+from .simulate import VOCABULARY
+
+
+# A busy server with all intents: mostly presences and typing, some messages.
+MIX = (("PRESENCE_UPDATE", 6), ("TYPING_START", 3), ("MESSAGE_CREATE", 2), ("GUILD_MEMBER_UPDATE", 1))
+
+ZLIB_SUFFIX = b"\x00\x00\xff\xff"
+
+
+def _user(rng: random.Random, user_id: int, bot: bool = False) -> dict:
+    return {"id": str(user_id), "username": f"user{user_id % 10_000}", "discriminator": "0", "global_name": None,
+            "avatar": f"{rng.getrandbits(128):032x}", "bot": bot, "public_flags": 0}
+
+
+def _payload(sequence: int, event: str, data: dict) -> dict:
+    return {"op": 0, "s": sequence, "t": event, "d": data}
+
+
+def synthetic(count: int, seed: int = 0) -> typing.Iterator[dict]:
+    """
+    Gateway dispatches in roughly the mix a busy, all-intents server sends.
+    :param count: Amount of payloads.
+    :param seed: Random seed.
+    """
+    rng = random.Random(seed)
+    guild = str(rng.getrandbits(60))
+    events, weights = zip(*MIX)
+
+    for sequence in range(1, count + 1):
+        event = rng.choices(events, weights)[0]
+        user_id = rng.getrandbits(60)
+        channel = str(rng.getrandbits(60))
+
+        if event == "PRESENCE_UPDATE":
+            data = {"user": {"id": str(user_id)}, "guild_id": guild, "status": rng.choice(("online", "idle", "dnd")),
+                    "client_status": {"desktop": "online"},
+                    "activities": [{"name": "Custom Status", "type": 4, "state": " ".join(rng.choices(VOCABULARY, k=3)),
+                                    "created_at": 1_688_371_200_000 + sequence}]}
+        elif event == "TYPING_START":
+            data = {"user_id": str(user_id), "channel_id": channel, "guild_id": guild,
+                    "timestamp": 1_688_371_200 + sequence,
+                    "member": {"user": _user(rng, user_id), "roles": [], "joined_at": "2023-07-03T08:00:00+00:00"}}
+        elif event == "MESSAGE_CREATE":
+            data = {"id": str(rng.getrandbits(60)), "channel_id": channel, "guild_id": guild, "type": 0,
+                    "author": _user(rng, user_id), "content": " ".join(rng.choices(VOCABULARY, k=rng.randint(2, 20))),
+                    "timestamp": "2023-07-03T08:00:00.000000+00:00", "edited_timestamp": None, "tts": False,
+                    "mention_everyone": False, "mentions": [], "mention_roles": [], "attachments": [], "embeds": [],
+                    "pinned": False, "flags": 0, "member": {"roles": [], "joined_at": "2023-07-03T08:00:00+00:00"}}
+        else:
+            data = {"guild_id": guild, "user": _user(rng, user_id), "roles": [str(rng.getrandbits(60))],
+                    "nick": None, "joined_at": "2023-07-03T08:00:00+00:00", "communication_disabled_until": None}
+
+        yield _payload(sequence, event, data)
+
+
+def replayed(paths: typing.Iterable[str]) -> typing.Iterator[dict]:
+    """
+    Gateway-shaped dispatches for recorded events. Sizes are close; content is whatever the recording kept.
+    :param paths: Recording files.
+    """
+    for sequence, event in enumerate(read_recording(paths), 1):
+        yield {"op": 0, "s": sequence, "t": event["e"].upper(), "d": event["d"]}
+
+
+def frames(payloads: typing.Iterable[dict], compress: bool) -> list[bytes | str]:
+    """
+    Encodes payloads as the gateway would send them: one zlib stream, flushed per message, or plain text.
+    """
+    if not compress:
+        return [json.dumps(payload, separators=(",", ":")) for payload in payloads]
+
+    stream = zlib.compressobj()
+    return [stream.compress(json.dumps(payload, separators=(",", ":")).encode()) + stream.flush(zlib.Z_SYNC_FLUSH)
+            for payload in payloads]
+
+
+# ==================================== PROFILES ====================================
+def loops() -> dict[str, typing.Callable[[], asyncio.AbstractEventLoop]]:
+    """ Installed event loops, by name. """
+    available = {"asyncio": asyncio.new_event_loop}
+
+    try:
+        import uvloop
+        available["uvloop"] = uvloop.new_event_loop
+    except ImportError:
+        pass
+
+    return available
+
+
+def codecs() -> dict[str, typing.Callable[[str | bytes], dict]]:
+    """ Installed JSON decoders, by name. """
+    available = {"json": json.loads}
+
+    try:
+        import orjson
+        available["orjson"] = orjson.loads
+    except ImportError:
+        pass
+
+    return available
+
+
+async def replay(data: list[bytes | str], decode: typing.Callable[[str | bytes], dict]) -> int:
+    """
+    Receives frames like py-cord's gateway: inflates complete messages, decodes them, and runs a handler task for
+    each dispatch.
+    :return: Dispatches handled.
+    """
+    inflator = zlib.decompressobj()
+    buffer = bytearray()
+    handled = 0
+
+    async def handler(payload: dict) -> None:
+        nonlocal handled
+        handled += payload["t"] is not None
+
+    pending = []
+    for frame in data:
+        if type(frame) is bytes:
+            buffer.extend(frame)
+            if len(frame) < 4 or frame[-4:] != ZLIB_SUFFIX:
+                continue
+
+            frame = inflator.decompress(buffer)
+            buffer.clear()
+
+        pending.append(asyncio.create_task(handler(decode(frame))))
+
+        # Let handlers run now and then, as the gateway does between reads.
+        if len(pending) >= 64:
+            await asyncio.gather(*pending)
+            pending.clear()
+
+    await asyncio.gather(*pending)
+    return handled
+
+
+def run(payloads: list[dict], repeats: int = 3) -> list[dict]:
+    """
+    Replays the payloads under every installed profile.
+    :param payloads: Gateway dispatches.
+    :param repeats: Runs per profile, keeping the best.
+    :return: One result per profile.
+    """
+    encoded = {compress: frames(payloads, compress) for compress in (True, False)}
+    results = []
+
+    for (loop_name, new_loop), (codec, decode), compress in itertools.product(loops().items(), codecs().items(),
+                                                                             (True, False)):
+        best_wall = best_cpu = float("inf")
+
+        for _ in range(repeats):
+            loop = new_loop()
+            try:
+                wall, cpu = time.perf_counter(), time.process_time()
+                handled = loop.run_until_complete(replay(encoded[compress], decode))
+                best_wall = min(best_wall, time.perf_counter() - wall)
+                best_cpu = min(best_cpu, time.process_time() - cpu)
+            finally:
+                loop.close()
+
+        results.append({"loop": loop_name, "json": codec, "compression": "zlib-stream" if compress else "none",
+                        "events_per_second": handled / best_wall, "cpu_us_per_event": best_cpu / handled * 1e6})
+
+    return results
+
+
+def report(results: list[dict]) -> None:
+    """ Prints results, fastest first, relative to the stock profile. """
+    stock = next(r for r in results if (r["loop"], r["json"], r["compression"]) == ("asyncio", "json", "zlib-stream"))
+
+    print(f"{'loop':<8} {'json':<7} {'compression':<12} {'events/s':>10} {'cpu us/event':>13} {'vs stock':>9}")
+    for result in sorted(results, key=lambda r: r["cpu_us_per_event"]):
+        change = result["cpu_us_per_event"] / stock["cpu_us_per_event"] - 1
+        print(f"{result['loop']:<8} {result['json']:<7} {result['compression']:<12} "
+              f"{result['events_per_second']:>10.0f} {result['cpu_us_per_event']:>13.2f} {change:>+9.1%}")
+
+    missing = {"uvloop"} - {r["loop"] for r in results} | {"orjson"} - {r["json"] for r in results}
+    if missing:
+        print(f"Not installed, not compared: {', '.join(sorted(missing))}.")
+
+
+def main(argv: list[str] = None) -> None:
+    parser = argparse.ArgumentParser(description="Compare runtime profiles on replayed gateway traffic.")
+    parser.add_argument("--events", type=int, default=100_000, help="Synthetic events to replay.")
+    parser.add_argument("--seed", type=int, default=0, help="Random seed for synthetic traffic.")
+    parser.add_argument("--recording", nargs="+", metavar="PATH", help="Replay these recordings instead.")
+    parser.add_argument("--repeats", type=int, default=3, help="Runs per profile, keeping the best.")
+    parser.add_argument("--json", metavar="PATH", help="Also save the results as JSON.")
+    args = parser.parse_args(argv)
+
+    payloads = list(replayed(args.recording) if args.recording else synthetic(args.events, args.seed))
+    print(f"Python {platform.python_version()} on {platform.machine()}, {len(payloads)} events.")
+
+    results = run(payloads, args.repeats)
+    report(results)
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as file:
+            json.dump(results, file, indent=2)
+
+
+if __name__ == "__main__":
+    main()
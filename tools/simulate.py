@@ -0,0 +1,307 @@
+"""
+    Runs Hal against simulated chatter on a virtual clock. A day of conversation across many channels takes seconds,
+    and the same seed always plays out the same way.
+
+    python -m tools.simulate --hours 24 --guilds 4 --channels 8 --seed 1
+"""
+import argparse
+import asyncio
+import collections
+import contextlib
+import datetime as dt
+import logging
+import random
+import sys
+import time
+import traceback
+import types
+import typing
+
+import config
+import cogs
+from discord.ext import commands
+
+from bot import GuildSettings, LilHalJr, Persona, VirtualClock, VirtualEventLoop, common
+
+from .fakes import FakeChannel, FakeGuild, FakeMessage, FakeUser
+
+
+VOCABULARY = ("the", "a", "i", "you", "it", "was", "is", "so", "that", "really", "think", "game", "cat", "lol",
+              "what", "did", "we", "do", "today", "tomorrow", "homework", "dinner", "weird", "cool", "maybe", "no",
+              "yes", "why", "how", "music", "frog", "computer", "broke", "again", "anyway", "honestly")
+
+# Simulation starts on a quiet Monday morning.
+DEFAULT_EPOCH = dt.datetime(2023, 7, 3, 8, tzinfo=dt.timezone.utc).timestamp()
+
+
+class World:
+    """
+    A few guilds full of chatty humans, and Cranebot. Everything is driven by its own seeded random generator.
+    """
+    def __init__(self, bot: LilHalJr, rng: random.Random, guilds: int = 2, channels: int = 6, members: int = 12):
+        """
+        Builds the world and connects Hal to it.
+        :param bot: Hal, not yet running.
+        :param rng: Random generator for the humans' behavior.
+        :param guilds: Amount of guilds. The home and secret guilds are always included.
+        :param channels: Chat channels per guild, on top of an introductions and a vent channel.
+        :param members: Human members per guild.
+        """
+        self.bot = bot
+        self.rng = rng
+        self.stats = collections.Counter()
+
+        self.hal = FakeUser("Lil Hal Jr.", bot=True)
+        self.guilds: list[FakeGuild] = []
+
+        guild_ids = [config.HOME_GUILD, config.SECRET_GUILD] + [None] * max(guilds - 2, 0)
+        for i, guild_id in enumerate(guild_ids):
+            guild = FakeGuild(self, f"guild-{i}", guild_id)
+            guild.add_channel("general")
+            guild.add_channel("introductions")
+            guild.add_channel("vent")
+            for j in range(channels - 1):
+                guild.add_channel(f"chat-{j}")
+
+            guild.add_member(self.hal)
+            guild.add_member(FakeUser("Cranebot", config.CRANEBOT_ID, bot=True, guild=guild))
+            for j in range(members):
+                guild.add_member(FakeUser(f"human-{i}-{j}", guild=guild))
+
+            self.guilds.append(guild)
+
+        # Plug the world in where the gateway would be.
+        bot._connection.user = self.hal
+        for guild in self.guilds:
+            bot._connection._guilds[guild.id] = guild
+
+        # Count anything that goes wrong in Hal, instead of letting it scroll by.
+        self.__reported = set()
+        bot.on_error = self.on_error
+        bot.add_listener(self.on_command_error)
+        bot.loop.set_exception_handler(self.on_loop_error)
+
+    # ==================================== WORLD EVENTS ====================================
+    def on_message(self, message: FakeMessage, **_kwargs) -> None:
+        """ Posts a message and tells Hal about it. """
+        channel = message.channel
+        channel.messages.append(message)
+        del channel.messages[:-50]
+
+        if message.author is self.hal:
+            self.stats["hal messages"] += 1
+
+            # Someone may get annoyed.
+            if not self.rng.randint(0, 49):
+                asyncio.create_task(self.react(message, config.QUIET_EMOJI))
+
+        else:
+            self.stats["messages"] += 1
+
+        # Cranebot answers its commands.
+        if message.content.startswith("%") and message.author.id != config.CRANEBOT_ID:
+            asyncio.create_task(self.cranebot_reply(channel))
+
+        self.bot.dispatch("message", message)
+
+    def on_typing(self, channel: FakeChannel, user: FakeUser) -> None:
+        """ Tells Hal someone is typing. """
+        self.stats["typing"] += 1
+        self.bot.dispatch("typing", channel, user, common.clock.now())
+
+    def on_reaction(self, message: FakeMessage, emoji: str) -> None:
+        """ Counts Hal's reactions. """
+        self.stats[f"hal reactions {emoji}"] += 1
+
+    # ==================================== ERRORS ====================================
+    def report(self, where: str, error: BaseException) -> None:
+        """ Counts an exception, printing its traceback the first time it's seen in a place. """
+        self.stats["errors"] += 1
+
+        if (key := (where, type(error))) not in self.__reported:
+            self.__reported.add(key)
+            print(f"Exception in {where}:", file=sys.stderr)
+            traceback.print_exception(error)
+
+    async def on_error(self, event_method: str, *_args, **_kwargs) -> None:
+        """ Hal's event handlers raised. """
+        self.report(event_method, sys.exc_info()[1])
+
+    async def on_command_error(self, ctx: commands.Context, error: commands.CommandError) -> None:
+        """ One of Hal's commands raised, rather than failing a check or getting bad arguments. """
+        if isinstance(error, commands.CommandInvokeError):
+            self.report(ctx.command.qualified_name, error.original)
+
+    def on_loop_error(self, loop: asyncio.AbstractEventLoop, context: dict) -> None:
+        """ A task nobody awaited raised. """
+        if (error := context.get("exception")) is not None:
+            self.report("a task", error)
+        else:
+            loop.default_exception_handler(context)
+
+    # ==================================== BEHAVIOR ====================================
+    def compose(self) -> tuple[str, bool]:
+        """
+        Makes up a message.
+        :return: The content, and whether it pings Hal.
+        """
+        words = self.rng.choices(VOCABULARY, k=self.rng.randint(1, 12))
+        roll = self.rng.random()
+
+        if roll < 0.03:
+            words += ["hal", self.rng.choice(list(config.quiet_phrases))]
+        elif roll < 0.04:
+            words += ["hal", self.rng.choice(config.return_phrases)]
+        elif roll < 0.05:
+            words = ["%toast"]
+        elif roll < 0.06:
+            words = ["^inquire", "is", "hal"] + words
+        elif roll < 0.10:
+            words.append("hal")
+            self.rng.shuffle(words)
+
+        return " ".join(words), roll > 0.99
+
+    async def chatter(self, channel: FakeChannel) -> None:
+        """ Humans talk in a channel, busier during the day. """
+        mean_gap = self.rng.uniform(30, 900)
+        humans = [m for m in channel.guild.members.values() if not m.bot]
+
+        while True:
+            hour = common.clock.now().hour
+            await common.clock.sleep(self.rng.expovariate(1 / mean_gap) * (1 if 14 <= hour or hour < 2 else 4))
+
+            author = self.rng.choice(humans)
+            self.on_typing(channel, author)
+            await common.clock.sleep(self.rng.uniform(1, 8))
+
+            content, ping = self.compose()
+            self.on_message(FakeMessage(channel, author, content, [self.hal] if ping else None))
+
+    async def arrivals(self) -> None:
+        """ New members join every so often, and usually say something. """
+        while True:
+            await common.clock.sleep(self.rng.expovariate(1 / 3600))
+
+            guild = self.rng.choice(self.guilds)
+            member = guild.add_member(FakeUser(f"newcomer-{self.stats['joins']}", guild=guild))
+            self.stats["joins"] += 1
+            self.bot.dispatch("member_join", member)
+
+            if self.rng.random() < 0.7:
+                await common.clock.sleep(self.rng.uniform(5, 90))
+                self.on_message(FakeMessage(guild.text_channels[0], member, "hi everyone"))
+
+    async def react(self, message: FakeMessage, emoji: str) -> None:
+        """ A human reacts to one of Hal's messages. """
+        await common.clock.sleep(self.rng.uniform(2, 30))
+
+        user = self.rng.choice([m for m in message.guild.members.values() if not m.bot])
+        self.stats["shush reactions"] += 1
+        self.bot.dispatch("raw_reaction_add", types.SimpleNamespace(
+            emoji=emoji, user_id=user.id, member=user, message_id=message.id,
+            channel_id=message.channel.id, guild_id=message.guild.id))
+
+    async def cranebot_reply(self, channel: FakeChannel) -> None:
+        """ Cranebot does its thing. """
+        await common.clock.sleep(self.rng.uniform(0.5, 4))
+        self.on_message(FakeMessage(channel, channel.guild.get_member(config.CRANEBOT_ID), "*Cranebot noises*"))
+
+    async def run(self, seconds: float) -> None:
+        """
+        Lets the world run for the given amount of (virtual) seconds.
+        :param seconds: How long to run.
+        """
+        self.bot._ready.set()
+
+        tasks = [asyncio.create_task(self.chatter(ch)) for guild in self.guilds for ch in guild.text_channels]
+        tasks.append(asyncio.create_task(self.arrivals()))
+
+        await common.clock.sleep(seconds)
+
+        for task in tasks:
+            task.cancel()
+
+
+@contextlib.contextmanager
+def virtual_world(seed: int = 0, guilds: int = 2, channels: int = 6, members: int = 12,
+                  log_level: str = "WARNING") -> typing.Iterator[tuple[VirtualEventLoop, World]]:
+    """
+    Sets up Hal, with all his cogs, in a fresh world on a virtual loop. Tears it all down afterwards.
+    :return: The loop and the world, Hal being `world.bot`.
+    """
+    random.seed(seed)
+
+    loop = VirtualEventLoop()
+    asyncio.set_event_loop(loop)
+
+    clock = VirtualClock(loop, DEFAULT_EPOCH)
+    clock.install()
+    real_clock, common.clock = common.clock, clock
+
+    # Logs in simulated time.
+    logger = logging.getLogger("lilhaljr")
+    for handler in logger.handlers:
+        if handler.formatter is not None:
+            handler.formatter.converter = lambda *_: time.localtime(clock.time())
+
+    try:
+        bot = LilHalJr(Persona(analytics_file=None))
+        bot.settings = GuildSettings(None)
+        for i in cogs.implemented:
+            bot.load_extension(f"cogs.{i}")
+        logger.setLevel(log_level)
+
+        yield loop, World(bot, random.Random(seed), guilds, channels, members)
+
+        # Tidy up whatever Hal was still waiting on.
+        pending = asyncio.all_tasks(loop)
+        for task in pending:
+            task.cancel()
+        loop.run_until_complete(asyncio.gather(*pending, return_exceptions=True))
+
+    finally:
+        loop.close()
+        asyncio.set_event_loop(None)
+        clock.uninstall()
+        common.clock = real_clock
+
+
+def simulate(hours: float = 24, seed: int = 0, guilds: int = 2, channels: int = 6, members: int = 12,
+             log_level: str = "WARNING") -> tuple[collections.Counter, float]:
+    """
+    Runs a full simulation on a fresh virtual loop.
+    :return: The world's statistics, and the real time taken in seconds.
+    """
+    with virtual_world(seed, guilds, channels, members, log_level) as (loop, world):
+        started = time.perf_counter()
+        loop.run_until_complete(world.run(hours * 3600))
+        elapsed = time.perf_counter() - started
+
+    world.stats["muted channels at end"] = len(world.bot.muted_channels)
+    return world.stats, elapsed
+
+
+def main(argv: list[str] = None) -> None:
+    parser = argparse.ArgumentParser(description="Simulate Lil Hal Jr. on a virtual clock.")
+    parser.add_argument("--hours", type=float, default=24, help="Simulated hours.")
+    parser.add_argument("--seed", type=int, default=0, help="Random seed.")
+    parser.add_argument("--guilds", type=int, default=2, help="Amount of guilds.")
+    parser.add_argument("--channels", type=int, default=6, help="Chat channels per guild.")
+    parser.add_argument("--members", type=int, default=12, help="Human members per guild.")
+    parser.add_argument("--log-level", default="WARNING", help="Hal's log level during the run.")
+    args = parser.parse_args(argv)
+
+    stats, elapsed = simulate(args.hours, args.seed, args.guilds, args.channels, args.members, args.log_level)
+
+    print(f"Simulated {args.hours:g} hours in {elapsed:.2f} seconds.")
+    for key, value in sorted(stats.items()):
+        print(f"  {key}: {value}")
+
+    if stats["errors"]:
+        print(f"{stats['errors']} exceptions in Hal's handlers.")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()